@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import DeadJob, Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'priority', 'attempts', 'run_at',
+                    'locked_by', )
+    list_filter = ('name', )
+
+
+class DeadJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'attempts', 'failed_at', )
+    list_filter = ('name', )
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(DeadJob, DeadJobAdmin)
@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .auth import connect_signals
+        from .querycache import install
+
+        # Регистрируем задачи из модулей tasks.py всех приложений.
+        autodiscover_modules('tasks')
+        # Любая запись через ORM сбрасывает кэш запросов к таблице.
+        connection_created.connect(install)
+        # Кэш пользователей сбрасывается при их изменении и выходе.
+        connect_signals()
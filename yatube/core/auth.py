@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model,
+    load_backend,
+)
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import constant_time_compare
+
+from .caching import invalidate_tags, tagged_key
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def get_user(request):
+    """То же, что django.contrib.auth.get_user, но строка пользователя
+    берётся из общего кэша.
+
+    Запись сбрасывается тегом user:<id> при любом сохранении
+    пользователя (смена пароля, last_login, правка профиля) и при
+    выходе. Хэш пароля в сессии по-прежнему сверяется на каждом запросе.
+    """
+    try:
+        user_id = get_user_model()._meta.pk.to_python(
+            request.session[SESSION_KEY])
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    key = tagged_key(f'auth:user:{user_id}', [user_tag(user_id)])
+    user = cache.get(key)
+    if user is None:
+        user = load_backend(backend_path).get_user(user_id)
+        if user is None:
+            return AnonymousUser()
+        cache.set(key, user, USER_CACHE_TIMEOUT)
+    user.backend = backend_path
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_tags(user_tag(instance.pk))
+
+
+def invalidate_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_tags(user_tag(user.pk))
+
+
+def connect_signals():
+    user_model = get_user_model()
+    post_save.connect(invalidate_user, sender=user_model)
+    post_delete.connect(invalidate_user, sender=user_model)
+    user_logged_out.connect(invalidate_on_logout)
@@ -0,0 +1,37 @@
+from django.db.backends.sqlite3 import base
+
+# Профиль для продакшена: WAL, чтобы читатели не ждали писателя,
+# и ожидание блокировки вместо мгновенного "database is locked".
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с настройкой PRAGMA на каждом соединении.
+
+    Значения по умолчанию можно переопределить в OPTIONS['pragmas'].
+
+    Транзакции открываются через BEGIN IMMEDIATE: писатель берёт
+    блокировку сразу и ждёт её в пределах busy_timeout, а не падает
+    при попытке повысить блокировку чтения до записи посреди транзакции.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop('pragmas', {})}
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
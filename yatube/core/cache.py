@@ -0,0 +1,208 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value, expires REAL, accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+)
+# Как часто (в секундах) обновлять время доступа при чтении: точный LRU
+# превратил бы каждое чтение в запись.
+ACCESS_RESOLUTION = 1.0
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в общем SQLite-файле, видимый всем процессам на хосте.
+
+    Целые числа хранятся как INTEGER, поэтому incr выполняется одним
+    UPDATE; остальные значения сериализуются pickle. При превышении
+    MAX_ENTRIES вытесняются давно не читанные записи (приближённый LRU).
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        # После fork соединение родителя использовать нельзя.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(
+                self._path, timeout=10, isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def _encode(self, value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _alive(self, now):
+        return f'(expires IS NULL OR expires > {now!r})'
+
+    def _cull(self, db):
+        count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        db.execute(f'DELETE FROM cache WHERE NOT {self._alive(time.time())}')
+        count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            db.execute('DELETE FROM cache')
+            return
+        db.execute(
+            'DELETE FROM cache WHERE key IN ('
+            'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            (count // self._cull_frequency,),
+        )
+
+    def _set_rows(self, rows, mode='REPLACE'):
+        db = self._db
+        now = time.time()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            if mode == 'IGNORE':
+                db.executemany(
+                    'DELETE FROM cache WHERE key = ? AND NOT '
+                    + self._alive(now), [(row[0],) for row in rows],
+                )
+            cursor = db.executemany(
+                f'INSERT OR {mode} INTO cache (key, value, expires, accessed)'
+                ' VALUES (?, ?, ?, ?)',
+                [row + (now,) for row in rows],
+            )
+            changed = cursor.rowcount
+            self._cull(db)
+        return changed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        row = (key, self._encode(value), self.get_backend_timeout(timeout))
+        return self._set_rows([row], mode='IGNORE') == 1
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._set_rows(
+            [(key, self._encode(value), self.get_backend_timeout(timeout))]
+        )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        self._set_rows([
+            (self._key(key, version), self._encode(value), expires)
+            for key, value in data.items()
+        ])
+        return []
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._get_many([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        found = self._get_many(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    def _get_many(self, keys):
+        if not keys:
+            return {}
+        db = self._db
+        now = time.time()
+        placeholders = ', '.join('?' * len(keys))
+        rows = db.execute(
+            f'SELECT key, value, accessed FROM cache '
+            f'WHERE key IN ({placeholders}) AND {self._alive(now)}',
+            keys,
+        ).fetchall()
+        stale = [
+            (now, key) for key, _, accessed in rows
+            if now - accessed > ACCESS_RESOLUTION
+        ]
+        if stale:
+            db.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?', stale
+            )
+        return {key: self._decode(value) for key, value, _ in rows}
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ?, accessed = ? WHERE key = ? AND '
+            + self._alive(now),
+            (self.get_backend_timeout(timeout), now, key),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        """Атомарное увеличение одним UPDATE ... RETURNING."""
+        key = self._key(key, version)
+        now = time.time()
+        row = self._db.execute(
+            'UPDATE cache SET value = value + ?, accessed = ? '
+            "WHERE key = ? AND typeof(value) = 'integer' AND "
+            + self._alive(now) + ' RETURNING value',
+            (delta, now, key),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        # Значение не целое (например, сохранено как pickle): читаем
+        # и пишем в одной транзакции записи.
+        db = self._db
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? AND '
+                + self._alive(now), (key,),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = self._decode(row[0]) + delta
+            db.execute(
+                'UPDATE cache SET value = ?, accessed = ? WHERE key = ?',
+                (self._encode(value), now, key),
+            )
+        return value
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? AND '
+            + self._alive(time.time()), (key,),
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = [(self._key(key, version),) for key in keys]
+        if keys:
+            self._db.executemany('DELETE FROM cache WHERE key = ?', keys)
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
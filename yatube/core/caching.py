@@ -0,0 +1,143 @@
+import hashlib
+import math
+import random
+import threading
+import time
+import weakref
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Сколько секунд после истечения TTL значение ещё можно отдавать,
+# пока кто-то один его пересчитывает.
+STALE_TIMEOUT = 60
+# Коэффициент раннего вероятностного обновления (XFetch): чем больше,
+# тем раньше до истечения TTL начинаются пересчёты.
+BETA = 1.0
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 5
+WAIT_STEP = 0.05
+
+# Блокировки живут, пока их кто-то держит, и не копятся по ключам.
+_local_locks = weakref.WeakValueDictionary()
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = _local_locks[key] = threading.Lock()
+        return lock
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; отсутствующие получают новую версию.
+
+    Новая версия берётся от времени, а не с единицы: если версия тега
+    вытеснена из кэша, старые записи не оживут под тем же ключом.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def tagged_key(key, tags):
+    """Ключ записи в пространстве имён текущих версий её тегов."""
+    if not tags:
+        return key
+    versions = ':'.join(str(version) for version in tag_versions(tags))
+    return f'{key}:{hashlib.md5(versions.encode()).hexdigest()}'
+
+
+def invalidate_tags(*tags):
+    """Инвалидирует все записи с этими тегами за O(1) на тег.
+
+    Записи не удаляются: после смены версии на них никто не ссылается,
+    и они вытесняются по TTL или LRU.
+    """
+    for tag in tags:
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            # Версии нет — значит, и записей с этим тегом нет.
+            pass
+
+
+def invalidate_on_commit(*tags, using=DEFAULT_DB_ALIAS):
+    """invalidate_tags() сейчас и ещё раз после фиксации транзакции.
+
+    До фиксации другие соединения видят старые строки и могут снова
+    положить их в кэш; повторный сброс не даёт им пережить коммит.
+    """
+    invalidate_tags(*tags)
+    if connections[using].in_atomic_block:
+        transaction.on_commit(lambda: invalidate_tags(*tags), using=using)
+
+
+def _should_refresh(expires, delta, beta):
+    # XFetch: вероятность пересчёта растёт по мере приближения к expires
+    # и пропорциональна тому, сколько стоит пересчёт.
+    gap = -delta * beta * math.log(1.0 - random.random())
+    return time.time() + gap >= expires
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    cache.set(
+        key, (value, started + timeout, delta), timeout + stale_timeout
+    )
+    return value
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=STALE_TIMEOUT,
+                   beta=BETA, tags=()):
+    """Возвращает значение из кэша, пересчитывая его не более одним
+    клиентом одновременно.
+
+    Устаревшее значение отдаётся, пока держатель блокировки его
+    пересчитывает. При холодном промахе одинаковые запросы потоков
+    ждут один пересчёт, а процессы — блокировку в общем кэше.
+    Запись сбрасывается invalidate_tags() по любому из tags.
+    """
+    key = tagged_key(key, tags)
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        if not _should_refresh(expires, delta, beta):
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return value
+        try:
+            return _compute_and_store(key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
+
+    with _local_lock(key):
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                # Держатель блокировки завис: считаем сами.
+                return compute()
+            time.sleep(WAIT_STEP)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+        try:
+            return _compute_and_store(key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.db import DatabaseError, connections, router, transaction
+
+logger = logging.getLogger(__name__)
+
+# Буфер сбрасывается не позже чем через FLUSH_INTERVAL секунд после
+# первого несброшенного приращения или при накоплении FLUSH_EVENTS.
+FLUSH_INTERVAL = 10
+FLUSH_EVENTS = 1000
+
+
+class FlushTimer:
+    """Отложенный сброс буфера в фоновом потоке.
+
+    arm() взводит таймер, если он ещё не взведён; через interval секунд
+    вызывается callback. Так буфер сбрасывается и у процесса, к
+    которому больше не приходят события.
+    """
+
+    def __init__(self, interval, callback, label):
+        self.interval = interval
+        self.callback = callback
+        self.label = label
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def arm(self):
+        with self.lock:
+            if self.timer is None:
+                self.timer = threading.Timer(self.interval, self._run)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def cancel(self):
+        with self.lock:
+            timer, self.timer = self.timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+    def call(self):
+        """Сброс из кода запроса: ошибка базы только пишется в лог.
+
+        callback возвращает несброшенное в буфер и взводит таймер, так
+        что запись повторится без участия запроса.
+        """
+        try:
+            self.callback()
+        except DatabaseError:
+            logger.exception('Сброс %s отложен', self.label)
+
+    def _run(self):
+        with self.lock:
+            if self.timer is threading.current_thread():
+                self.timer = None
+        try:
+            self.call()
+        finally:
+            # Соединения потока таймера больше никому не нужны.
+            connections.close_all()
+
+
+class BufferedCounter:
+    """Счётчики в памяти процесса с пакетным сбросом в базу.
+
+    model — таблица счётчиков, первичный ключ которой ссылается на
+    считаемый объект (OneToOneField с primary_key=True), field — поле
+    счётчика. Приращения одного ключа складываются локально и
+    сбрасываются одной транзакцией: один INSERT ... ON CONFLICT DO
+    UPDATE на все ключи. В базу пишутся только дельты, поэтому сбросы
+    разных процессов складываются в любом порядке. Фоновый таймер
+    сбрасывает буфер и у простаивающего процесса, поэтому при падении
+    теряется не больше FLUSH_EVENTS приращений за FLUSH_INTERVAL секунд.
+
+    on_flush(counts) вызывается после фиксации сброса. incr() не
+    пробрасывает ошибки базы: он вызывается из запросов, а дельты
+    дождутся следующего сброса. Явный flush() ошибку пробрасывает.
+    """
+
+    def __init__(self, model, field, interval=FLUSH_INTERVAL,
+                 max_events=FLUSH_EVENTS, on_flush=None):
+        self.model = model
+        self.field = field
+        self.interval = interval
+        self.max_events = max_events
+        self.on_flush = on_flush
+        self.pending = Counter()
+        self.events = 0
+        self.flushed_at = time.monotonic()
+        self.flusher = FlushTimer(
+            interval, self.flush, f'счётчиков {model._meta.label}')
+        self.lock = threading.Lock()
+
+    def incr(self, key, delta=1):
+        with self.lock:
+            self.pending[key] += delta
+            self.events += 1
+            due = (
+                self.events >= self.max_events
+                or time.monotonic() - self.flushed_at >= self.interval
+            )
+        if due:
+            self.flusher.call()
+        else:
+            self.flusher.arm()
+
+    def pending_for(self, key):
+        """Ещё не сброшенные приращения этого процесса."""
+        with self.lock:
+            return self.pending.get(key, 0)
+
+    def _sql(self, connection):
+        meta = self.model._meta
+        target = meta.pk.related_model._meta
+        qn = connection.ops.quote_name
+        key = qn(meta.pk.column)
+        column = qn(meta.get_field(self.field).column)
+        # Строки удалённых объектов отбрасываются подзапросом, иначе
+        # внешний ключ сорвал бы фиксацию всего пакета.
+        return (
+            f'INSERT INTO {qn(meta.db_table)} ({key}, {column}) '
+            f'SELECT {qn(target.pk.column)}, %s FROM {qn(target.db_table)} '
+            f'WHERE {qn(target.pk.column)} = %s '
+            f'ON CONFLICT ({key}) DO UPDATE '
+            f'SET {column} = {column} + excluded.{column}'
+        )
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.events = 0
+            self.flushed_at = time.monotonic()
+        self.flusher.cancel()
+        if not pending:
+            return
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        try:
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    cursor.executemany(self._sql(connection), [
+                        (delta, key)
+                        for key, delta in sorted(pending.items())
+                    ])
+                if self.on_flush is not None:
+                    counts = dict(pending)
+                    transaction.on_commit(
+                        lambda: self.on_flush(counts), using=using
+                    )
+        except DatabaseError:
+            # Дельты не потеряны: вернутся в следующий сброс.
+            with self.lock:
+                self.pending.update(pending)
+                self.events += len(pending)
+            self.flusher.arm()
+            raise
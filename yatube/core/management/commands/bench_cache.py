@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.cache import SQLiteCache
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость операций SQLiteCache и LocMemCache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=1000)
+
+    def measure(self, cache, keys):
+        value = {'html': 'x' * 2000}
+        timings = {}
+        started = time.perf_counter()
+        for key in keys:
+            cache.set(key, value)
+        timings['set'] = time.perf_counter() - started
+        started = time.perf_counter()
+        for key in keys:
+            cache.get(key)
+        timings['get'] = time.perf_counter() - started
+        started = time.perf_counter()
+        for start in range(0, len(keys), 50):
+            cache.get_many(keys[start:start + 50])
+        timings['get_many'] = time.perf_counter() - started
+        cache.set('counter', 0)
+        started = time.perf_counter()
+        for _ in keys:
+            cache.incr('counter')
+        timings['incr'] = time.perf_counter() - started
+        return {name: len(keys) / took for name, took in timings.items()}
+
+    def handle(self, keys, **options):
+        keys = [f'key:{i}' for i in range(keys)]
+        params = {'OPTIONS': {'MAX_ENTRIES': len(keys) * 2}}
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                'locmem': LocMemCache('bench', params),
+                'sqlite': SQLiteCache(
+                    os.path.join(directory, 'cache.sqlite3'), params),
+            }
+            self.stdout.write(
+                f'{"backend":<8} {"set/s":>10} {"get/s":>10} '
+                f'{"get_many/s":>11} {"incr/s":>10}'
+            )
+            for name, cache in backends.items():
+                ops = self.measure(cache, keys)
+                self.stdout.write(
+                    f'{name:<8} {ops["set"]:>10.0f} {ops["get"]:>10.0f} '
+                    f'{ops["get_many"]:>11.0f} {ops["incr"]:>10.0f}'
+                )
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.backends.sqlite3.base import DEFAULT_PRAGMAS
+
+PROFILES = {
+    'default': ({}, 'BEGIN'),
+    'tuned': (DEFAULT_PRAGMAS, 'BEGIN IMMEDIATE'),
+}
+
+
+def connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for pragma, value in pragmas.items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
+    return conn
+
+
+def read(path, pragmas, deadline, stats, lock):
+    conn = connect(path, pragmas)
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(
+                'SELECT id, text FROM post '
+                'ORDER BY pub_date DESC LIMIT 10'
+            ).fetchall()
+            key = 'reads'
+        except sqlite3.OperationalError:
+            key = 'locked'
+        with lock:
+            stats[key] += 1
+    conn.close()
+
+
+def write(path, pragmas, begin, deadline, stats, lock):
+    # Как post_create: сначала чтение, затем запись в одной транзакции.
+    conn = connect(path, pragmas)
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(begin)
+            conn.execute('SELECT count(*) FROM post').fetchone()
+            conn.execute(
+                'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+                ('x' * 200, time.time()),
+            )
+            conn.execute('COMMIT')
+            key = 'writes'
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            key = 'locked'
+        with lock:
+            stats[key] += 1
+    conn.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность читателей и писателей SQLite '
+        'с настройками по умолчанию и с продакшен-профилем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=3.0)
+
+    def run_profile(self, profile, readers, writers, seconds):
+        pragmas, begin = PROFILES[profile]
+        stats = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            conn = connect(path, pragmas)
+            conn.execute(
+                'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT, '
+                'pub_date REAL)'
+            )
+            conn.close()
+            deadline = time.monotonic() + seconds
+            threads = (
+                [threading.Thread(target=read, args=(
+                    path, pragmas, deadline, stats, lock,
+                )) for _ in range(readers)]
+                + [threading.Thread(target=write, args=(
+                    path, pragmas, begin, deadline, stats, lock,
+                )) for _ in range(writers)]
+            )
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return {key: value / seconds for key, value in stats.items()}
+
+    def handle(self, readers, writers, seconds, **options):
+        self.stdout.write(
+            f'{"profile":<8} {"reads/s":>10} {"writes/s":>10} '
+            f'{"locked/s":>10}'
+        )
+        for profile in PROFILES:
+            stats = self.run_profile(profile, readers, writers, seconds)
+            self.stdout.write(
+                f'{profile:<8} {stats["reads"]:>10.0f} '
+                f'{stats["writes"]:>10.0f} {stats["locked"]:>10.1f}'
+            )
@@ -0,0 +1,36 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии пачками, не блокируя таблицу '
+            'надолго (замена clearsessions).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах, чтобы пропустить '
+                 'другие записи.',
+        )
+
+    def handle(self, batch_size, pause, **options):
+        now = timezone.now()
+        expired = Session.objects.filter(
+            expire_date__lt=now).order_by('expire_date')
+        total = 0
+        while True:
+            # Ключи берутся по индексу expire_date; каждое удаление —
+            # отдельная короткая транзакция на batch_size строк.
+            keys = list(expired.values_list(
+                'session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            Session.objects.filter(session_key__in=keys).delete()
+            total += len(keys)
+            if pause:
+                time.sleep(pause)
+        self.stdout.write(f'Удалено сессий: {total}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.querycache import stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша запросов ORM.'
+
+    def handle(self, **options):
+        result = stats()
+        self.stdout.write(
+            f'hits: {result["hits"]}  misses: {result["misses"]}  '
+            f'hit rate: {result["hit_rate"]:.1%}'
+        )
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.queue import run_pending
+
+
+def work(poll_interval, burst):
+    # Соединение, унаследованное от родителя после fork, использовать нельзя.
+    connections.close_all()
+    worker = f'{os.uname().nodename}:{os.getpid()}'
+    while True:
+        done = run_pending(worker)
+        if burst and not done:
+            return
+        if not done:
+            time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач из очереди core.Job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, когда готовых задач не останется.',
+        )
+
+    def handle(self, processes, poll_interval, burst, **options):
+        if processes == 1:
+            work(poll_interval, burst)
+            return
+        # Воркеры наследуют настроенный Django от родителя. При spawn
+        # (macOS, Python 3.14 на Linux) они стартовали бы без
+        # django.setup(), поэтому fork задан явно.
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=work, args=(poll_interval, burst))
+            for _ in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            for process in workers:
+                os.kill(process.pid, signal.SIGTERM)
@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную SQLite-базу в реплики через backup API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Алиасы реплик, по умолчанию settings.DATABASE_REPLICAS.',
+        )
+
+    def handle(self, aliases, **options):
+        aliases = aliases or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Не указано ни одной реплики.')
+        source = sqlite3.connect(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        try:
+            for alias in aliases:
+                if alias not in settings.DATABASES:
+                    raise CommandError(f'Неизвестная база: {alias}')
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    # Копирование по страницам не блокирует писателей
+                    # основной базы на всё время операции.
+                    source.backup(target, pages=1024)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: синхронизирована')
+        finally:
+            source.close()
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .auth import get_user
+from .routers import allow_replica, has_written, reset
+
+PIN_COOKIE = 'pin_primary'
+
+
+class ReplicaMiddleware:
+    """Разрешает чтение с реплик для представлений из REPLICA_VIEWS.
+
+    После любой записи клиент получает cookie и на REPLICA_PIN_SECONDS
+    закрепляется за основной базой, чтобы сразу видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                )
+        finally:
+            reset()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        allow_replica(
+            request.method in ('GET', 'HEAD')
+            and PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+        )
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущий пользователя из общего кэша."""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
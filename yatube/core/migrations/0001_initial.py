@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Задача')),
+                ('payload', models.TextField(verbose_name='Аргументы (JSON)')),
+                ('attempts', models.PositiveSmallIntegerField(verbose_name='Попытки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(verbose_name='Создана')),
+                ('failed_at', models.DateTimeField(auto_now_add=True, verbose_name='Провалена')),
+            ],
+            options={
+                'ordering': ('-failed_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Задача')),
+                ('payload', models.TextField(default='{}', verbose_name='Аргументы (JSON)')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Приоритет')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Запустить не раньше')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Воркер')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+            ],
+            options={
+                'ordering': ('-priority', 'run_at', 'pk'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['locked_by', '-priority', 'run_at'], name='job_ready_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    name = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=5
+    )
+    run_at = models.DateTimeField('Запустить не раньше', default=timezone.now)
+    locked_by = models.CharField('Воркер', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.name} #{self.pk}'
+
+    class Meta:
+        ordering = ('-priority', 'run_at', 'pk')
+        indexes = [
+            models.Index(
+                fields=['locked_by', '-priority', 'run_at'],
+                name='job_ready_idx',
+            ),
+        ]
+
+
+class DeadJob(models.Model):
+    name = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы (JSON)')
+    attempts = models.PositiveSmallIntegerField('Попытки')
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана')
+    failed_at = models.DateTimeField('Провалена', auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.name} #{self.pk}'
+
+    class Meta:
+        ordering = ('-failed_at',)
@@ -0,0 +1,109 @@
+import hashlib
+import re
+import uuid
+
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Engine
+
+from .caching import get_or_compute
+
+PAGE_TIMEOUT = 60
+# Переменная контекста, по которой тег {% hole %} понимает, что
+# рендерится общий для всех каркас страницы.
+HOLES_VAR = 'page_holes'
+
+
+class PageHoles:
+    """Дырки каркаса: шаблон и аргументы каждого персонального фрагмента.
+
+    Метка в заглушке случайна для каждого каркаса, поэтому текст поста
+    не может подделать заглушку.
+    """
+
+    def __init__(self):
+        self.marker = uuid.uuid4().hex
+        self.items = []
+
+    def add(self, template_name, kwargs):
+        self.items.append((template_name, kwargs))
+        return f'<!--hole:{self.marker}:{len(self.items) - 1}-->'
+
+    def adopt(self, marker, html, items):
+        """Переносит в этот каркас дырки фрагмента, отрендеренного
+        с другой меткой (см. {% swrcache %})."""
+        return _substitute(
+            marker, html, lambda index: self.add(*items[index]))
+
+
+def _substitute(marker, html, replace):
+    return re.sub(
+        rf'<!--hole:{marker}:(\d+)-->',
+        lambda match: replace(int(match.group(1))),
+        html,
+    )
+
+
+def render_shell(template_name, context):
+    """Рендерит страницу без request и пользователя.
+
+    Всё персональное выводится только через {% hole %} и заменяется
+    заглушками; возвращает (marker, html, holes).
+    """
+    holes = PageHoles()
+    template = Engine.get_default().get_template(template_name)
+    html = template.render(Context({**context, HOLES_VAR: holes}))
+    return holes.marker, html, holes.items
+
+
+def render_fragment(nodelist, context):
+    """Рендерит часть каркаса со своими дырками: (marker, html, holes)."""
+    holes = PageHoles()
+    with context.push({HOLES_VAR: holes}):
+        html = nodelist.render(context)
+    return holes.marker, html, holes.items
+
+
+def fill_holes(request, shell, personal=None):
+    """Подставляет в каркас фрагменты, отрендеренные для request.
+
+    Контекст-процессоры выполняются один раз на запрос, а не на каждую
+    дырку; personal — общий для всех дырок персональный контекст.
+    """
+    marker, html, holes = shell
+    engine = Engine.get_default()
+    values = {}
+    for processor in engine.template_context_processors:
+        values.update(processor(request))
+    values.update(personal or {})
+    context = Context(values, autoescape=engine.autoescape)
+    rendered = []
+    for template_name, kwargs in holes:
+        with context.push(**kwargs):
+            rendered.append(engine.get_template(template_name).render(context))
+    return _substitute(marker, html, rendered.__getitem__)
+
+
+def cached_page(request, template_name, get_context, personalize=None,
+                timeout=PAGE_TIMEOUT, tags=()):
+    """Страница с общим для всех каркасом в кэше и персональными дырками.
+
+    get_context() строит контекст, одинаковый для всех пользователей;
+    он вызывается только при промахе. personalize(request, holes)
+    получает аргументы дырок каркаса и возвращает персональный контекст
+    для них (отметки, подписки, форму). Каркас сбрасывается по tags
+    и живёт не дольше timeout. Внутри транзакции страница собирается
+    без кэша: она могла увидеть незафиксированные данные.
+    """
+    def build():
+        return render_shell(template_name, get_context())
+
+    if connection.in_atomic_block:
+        shell = build()
+    else:
+        digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        shell = get_or_compute(f'page:{digest}', build, timeout, tags=tags)
+    personal = None
+    if personalize is not None:
+        personal = personalize(request, [kwargs for _, kwargs in shell[2]])
+    return HttpResponse(fill_holes(request, shell, personal))
@@ -0,0 +1,130 @@
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from .caching import invalidate_on_commit, tagged_key
+
+QUERY_CACHE_TIMEOUT = 60
+# Локальные счётчики сбрасываются в общий кэш раз в STATS_FLUSH обращений.
+STATS_FLUSH = 100
+STATS_KEYS = {'hits': 'querycache:hits', 'misses': 'querycache:misses'}
+WRITE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+# Таблицы запроса, включая подзапросы (author__in=..., Subquery, Exists):
+# alias_map внешнего запроса их не содержит.
+TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+"(\w+)"', re.IGNORECASE)
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+_classes = {}
+
+
+def table_tag(table):
+    return f'table:{table}'
+
+
+def _count(kind):
+    with _stats_lock:
+        _stats[kind] += 1
+        if _stats['hits'] + _stats['misses'] < STATS_FLUSH:
+            return
+        pending = dict(_stats)
+        _stats.update(hits=0, misses=0)
+    for name, value in pending.items():
+        if value and not cache.add(STATS_KEYS[name], value, None):
+            cache.incr(STATS_KEYS[name], value)
+
+
+def stats():
+    """Суммарные попадания и промахи всех процессов (с точностью до
+    ещё не сброшенных локальных счётчиков)."""
+    totals = cache.get_many(STATS_KEYS.values())
+    hits = totals.get(STATS_KEYS['hits'], 0)
+    misses = totals.get(STATS_KEYS['misses'], 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+class CachingQuerySetMixin:
+    """Кэширует результат запроса по SQL и параметрам.
+
+    Ключ зависит от версий всех таблиц запроса, поэтому любая запись
+    в таблицу через ORM делает прежние результаты недоступными.
+    Внутри транзакций кэш не используется: там могут быть видны
+    незафиксированные данные.
+    """
+
+    def _fetch_all(self):
+        if self._result_cache is not None or self._prefetch_related_lookups:
+            return super()._fetch_all()
+        connection = connections[self.db]
+        if connection.in_atomic_block:
+            return super()._fetch_all()
+        try:
+            sql, params = self.query.get_compiler(using=self.db).as_sql()
+        except EmptyResultSet:
+            return super()._fetch_all()
+        tables = {join.table_name for join in self.query.alias_map.values()}
+        tables.update(TABLE_RE.findall(sql))
+        tables = sorted(tables)
+        raw = f'{self.db}|{self._iterable_class.__name__}|{sql}|{params!r}'
+        key = tagged_key(
+            f'querycache:{hashlib.md5(raw.encode()).hexdigest()}',
+            [table_tag(table) for table in tables],
+        )
+        rows = cache.get(key)
+        if rows is not None:
+            _count('hits')
+            self._result_cache = rows
+            return
+        _count('misses')
+        super()._fetch_all()
+        cache.set(key, self._result_cache, QUERY_CACHE_TIMEOUT)
+
+
+def cached(queryset):
+    """Включает кэш результатов для queryset или менеджера
+    (и всех производных от них queryset)."""
+    queryset = queryset.all()
+    if not getattr(settings, 'QUERY_CACHE_ENABLED', True):
+        return queryset
+    base = type(queryset)
+    if issubclass(base, CachingQuerySetMixin):
+        return queryset
+    if base not in _classes:
+        _classes[base] = type(
+            f'Caching{base.__name__}', (CachingQuerySetMixin, base), {}
+        )
+    queryset.__class__ = _classes[base]
+    return queryset
+
+
+def invalidate_on_write(execute, sql, params, many, context):
+    """Обёртка курсора: после INSERT/UPDATE/DELETE сбрасывает таблицу.
+
+    Сброс повторяется после коммита, чтобы чтение, успевшее закэшировать
+    старые строки до фиксации транзакции, не пережило её.
+    """
+    result = execute(sql, params, many, context)
+    match = WRITE_RE.match(sql)
+    if match:
+        invalidate_on_commit(
+            table_tag(match.group(1)), using=context['connection'].alias)
+    return result
+
+
+def install(sender, connection, **kwargs):
+    if invalidate_on_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(invalidate_on_write)
@@ -0,0 +1,120 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DeadJob, Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+BACKOFF_BASE = 10
+BACKOFF_MAX = 60 * 60
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+def task(func=None, *, name=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    Имя по умолчанию — '<модуль>.<функция>', под ним задача
+    ставится в очередь и находится воркером.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        TASKS[task_name] = func
+        func.task_name = task_name
+        return func
+    if func is None:
+        return register
+    return register(func)
+
+
+def enqueue(func, *args, priority=0, delay=0, max_attempts=5, **kwargs):
+    """Ставит задачу в очередь; аргументы должны сериализоваться в JSON."""
+    name = getattr(func, 'task_name', func)
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps({'args': args, 'kwargs': kwargs}),
+        priority=priority,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** attempts, BACKOFF_MAX))
+
+
+def claim(worker):
+    """Забирает самую приоритетную готовую задачу.
+
+    Захват — условный UPDATE по свободной (или зависшей) строке,
+    поэтому два процесса не получат одну задачу.
+    """
+    now = timezone.now()
+    free = Q(locked_by='') | Q(locked_at__lt=now - LOCK_TIMEOUT)
+    candidates = Job.objects.filter(free, run_at__lte=now).values_list(
+        'pk', flat=True
+    )
+    for pk in candidates[:5]:
+        claimed = Job.objects.filter(free, pk=pk).update(
+            locked_by=worker, locked_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def fail(job, error):
+    job.attempts += 1
+    job.last_error = error
+    if job.attempts >= job.max_attempts:
+        # После delete() у задачи нет pk, подпись нужна заранее.
+        label = str(job)
+        with transaction.atomic():
+            dead = DeadJob.objects.create(
+                name=job.name,
+                payload=job.payload,
+                attempts=job.attempts,
+                last_error=error,
+                created=job.created,
+            )
+            job.delete()
+        logger.error(
+            'Задача %s перенесена в dead-letter #%s', label, dead.pk)
+        return
+    job.run_at = timezone.now() + backoff(job.attempts)
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'attempts', 'last_error', 'run_at', 'locked_by', 'locked_at'
+    ])
+
+
+def run_job(job):
+    try:
+        func = TASKS[job.name]
+        payload = json.loads(job.payload)
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', job)
+        fail(job, traceback.format_exc())
+        return False
+    job.delete()
+    return True
+
+
+def run_pending(worker='inline', limit=None):
+    """Выполняет готовые задачи, пока они есть; возвращает их число."""
+    done = 0
+    while limit is None or done < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
@@ -0,0 +1,52 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Модели этих приложений можно читать с реплики; сессии и прочее
+# служебное всегда читаются с основной базы.
+REPLICA_APPS = {'posts', 'auth'}
+
+state = threading.local()
+
+
+def reset():
+    state.use_replica = False
+    state.wrote = False
+
+
+def allow_replica(enabled):
+    state.use_replica = enabled
+
+
+def has_written():
+    return getattr(state, 'wrote', False)
+
+
+class ReplicaRouter:
+    """Направляет чтение из read-only представлений на реплики.
+
+    Решение, можно ли читать с реплики, принимает ReplicaMiddleware;
+    запись всегда идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if (
+            replicas
+            and getattr(state, 'use_replica', False)
+            and model._meta.app_label in REPLICA_APPS
+        ):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore,
+)
+
+KEY_PREFIX = 'core.sessions'
+
+# Срок сессии в базе продлевается, только когда он отстал от нового
+# больше чем на эту долю возраста сессии.
+REFRESH_FRACTION = 0.1
+
+
+class SessionStore(CachedDBStore):
+    """Сессии в базе с чтением из общего кэша и без лишних записей.
+
+    В кэше вместе с данными лежит срок, записанный в базу. save() не
+    трогает ни базу, ни кэш, если данные не изменились, а срок в базе
+    отстаёт от нового меньше чем на REFRESH_FRACTION возраста сессии.
+    Поэтому при SESSION_SAVE_EVERY_REQUEST запрос с неизменной сессией
+    ничего не пишет, а сессия в базе может истечь раньше cookie не
+    больше чем на эту долю.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # (закодированные данные, срок) — то, что сейчас лежит в базе.
+        self._persisted = None
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # См. cached_db: некоторые кэши падают на невалидном ключе.
+            entry = None
+        if entry is None:
+            s = self._get_session_from_db()
+            if s is None:
+                self._persisted = None
+                return {}
+            entry = (self.decode(s.session_data), s.expire_date)
+            self._cache.set(
+                self.cache_key, entry,
+                self.get_expiry_age(expiry=s.expire_date),
+            )
+        data, expire_date = entry
+        self._persisted = (self.encode(data), expire_date)
+        return data
+
+    def _unchanged(self):
+        if self._persisted is None or self.session_key is None:
+            return False
+        encoded, expire_date = self._persisted
+        if encoded != self.encode(self._get_session()):
+            return False
+        lag = self.get_expiry_date() - expire_date
+        return lag < timedelta(
+            seconds=self.get_expiry_age() * REFRESH_FRACTION)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            # create() вернётся сюда с must_create=True.
+            return self.create()
+        if not must_create and self._unchanged():
+            return
+        # В базу пишет DBStore, кэш cached_db заменяем своей записью.
+        super(CachedDBStore, self).save(must_create)
+        expire_date = self.get_expiry_date()
+        self._cache.set(
+            self.cache_key, (self._session, expire_date),
+            self.get_expiry_age(expiry=expire_date),
+        )
+        self._persisted = (self.encode(self._session), expire_date)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None or session_key == self.session_key:
+            self._persisted = None
@@ -0,0 +1,50 @@
+from django import template
+from django.template.base import token_kwargs
+
+from core.pagecache import HOLES_VAR
+
+register = template.Library()
+
+
+class HoleNode(template.Node):
+    def __init__(self, template_name, kwargs):
+        self.template_name = template_name
+        self.kwargs = kwargs
+
+    def render(self, context):
+        template_name = self.template_name.resolve(context)
+        kwargs = {
+            name: value.resolve(context)
+            for name, value in self.kwargs.items()
+        }
+        holes = context.get(HOLES_VAR)
+        if holes is not None:
+            return holes.add(template_name, kwargs)
+        included = context.template.engine.get_template(template_name)
+        with context.push(**kwargs):
+            return included.render(context)
+
+
+@register.tag
+def hole(parser, token):
+    """Персональный фрагмент страницы из core.pagecache.cached_page.
+
+    {% hole 'template.html' [name=value ...] %}
+
+    В обычном рендере работает как {% include %}. В общем каркасе
+    выводит заглушку, а шаблон рендерится для каждого запроса с
+    request, user, csrf_token и переданными аргументами; аргументы
+    сохраняются в кэше вместе с каркасом.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]!r} tag requires a template name.'
+        )
+    remaining = bits[2:]
+    kwargs = token_kwargs(remaining, parser)
+    if remaining:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]!r} tag accepts only name=value arguments.'
+        )
+    return HoleNode(parser.compile_filter(bits[1]), kwargs)
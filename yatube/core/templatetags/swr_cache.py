@@ -0,0 +1,65 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.caching import get_or_compute
+from core.pagecache import HOLES_VAR, render_fragment
+
+register = template.Library()
+
+
+class SWRCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on, tags):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+        self.tags = tags
+
+    def render(self, context):
+        timeout = int(self.timeout.resolve(context))
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        tags = self.tags.resolve(context).split(',') if self.tags else ()
+        holes = context.get(HOLES_VAR)
+        if holes is not None:
+            # В каркасе страницы фрагмент хранится вместе с дырками и
+            # переносит их в каждый каркас, куда попадает.
+            key = make_template_fragment_key(
+                self.fragment_name, ['shell', *vary_on])
+            shell = get_or_compute(
+                key, lambda: render_fragment(self.nodelist, context),
+                timeout, tags=tags,
+            )
+            return holes.adopt(*shell)
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        return get_or_compute(
+            key, lambda: self.nodelist.render(context), timeout, tags=tags
+        )
+
+
+@register.tag
+def swrcache(parser, token):
+    """Как {% cache %}, но без лавины пересчётов при истечении TTL.
+
+    {% swrcache timeout fragment_name [var1 var2 ...] [tags="a,b"] %}
+    ...
+    {% endswrcache %}
+
+    Фрагмент сбрасывается при инвалидации любого из тегов.
+    """
+    nodelist = parser.parse(('endswrcache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    tags = None
+    if len(tokens) > 3 and tokens[-1].startswith('tags='):
+        tags = parser.compile_filter(tokens.pop()[len('tags='):])
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    return SWRCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+        tags,
+    )
@@ -7,3 +7,10 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.filter
+def lookup(mapping, key):
+    if not isinstance(mapping, dict):
+        return None
+    return mapping.get(key)
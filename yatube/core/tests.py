@@ -0,0 +1,552 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core import mail, management
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.test import (RequestFactory, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from posts.models import Follow, Group, Post, PostViews
+from posts.reactions import like
+
+from . import routers
+from .cache import SQLiteCache
+from .counters import BufferedCounter
+from .caching import get_or_compute, invalidate_on_commit, invalidate_tags
+from . import querycache
+from .middleware import PIN_COOKIE, ReplicaMiddleware
+from .models import DeadJob, Job
+from .queue import TASKS, claim, enqueue, run_pending, task
+from .routers import ReplicaRouter, allow_replica, reset
+from .sessions import SessionStore
+
+CALLS = []
+
+
+@task(name='tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@task(name='tests.broken')
+def broken():
+    raise RuntimeError('boom')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        """Задачи выполняются по приоритету и удаляются из очереди."""
+        enqueue(record, 'low')
+        enqueue('tests.record', 'high', priority=5)
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(CALLS, ['high', 'low'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_delayed_job_not_claimed(self):
+        enqueue(record, 'later', delay=60)
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_claimed_job_not_taken_twice(self):
+        enqueue(record, 'once')
+        self.assertIsNotNone(claim('worker-1'))
+        self.assertIsNone(claim('worker-2'))
+
+    def test_retry_with_backoff_then_dead_letter(self):
+        """Упавшая задача откладывается, а после лимита попыток — в DeadJob."""
+        job = enqueue(broken, max_attempts=2)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        Job.objects.filter(pk=job.pk).update(
+            run_at=timezone.now() - timedelta(seconds=1))
+        run_pending()
+        self.assertFalse(Job.objects.exists())
+        dead = DeadJob.objects.get()
+        self.assertEqual(dead.attempts, 2)
+        self.assertIn('boom', dead.last_error)
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_password_reset_mail_is_queued(self):
+        """Сброс пароля только ставит письмо в очередь."""
+        get_user_model().objects.create_user(
+            username='user', email='user@example.com', password='pass')
+        self.client.post(
+            '/auth/password_reset/', {'email': 'user@example.com'})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn('users.tasks.send_mail', TASKS)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class SQLiteBackendTests(TestCase):
+    def test_pragmas_applied(self):
+        """Соединение получает PRAGMA из продакшен-профиля."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+
+
+class ReplicaRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def tearDown(self):
+        reset()
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_router(self):
+        """С реплики читаются только posts и auth и только по разрешению."""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Post), 'default')
+        allow_replica(True)
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_read(Session), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_read_view_allows_replica(self):
+        """Чтение с реплики разрешено read-only представлениям без cookie."""
+        middleware = ReplicaMiddleware(lambda request: None)
+        cases = {
+            ('posts:index', ''): True,
+            ('posts:index', '1'): False,
+            ('posts:post_create', ''): False,
+        }
+        for (view_name, pin), expected in cases.items():
+            with self.subTest(view_name=view_name, pin=pin):
+                request = RequestFactory().get(reverse(view_name))
+                request.resolver_match = resolve(request.path)
+                if pin:
+                    request.COOKIES[PIN_COOKIE] = pin
+                middleware.process_view(request, None, (), {})
+                self.assertEqual(routers.state.use_replica, expected)
+
+    def test_write_pins_to_primary(self):
+        """После записи клиент получает cookie закрепления за default."""
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Комментарий'},
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class SQLiteCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 4}})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shared_between_instances(self):
+        """Запись видна другому экземпляру (процессу) с тем же файлом."""
+        self.cache.set('key', {'value': 1})
+        other = SQLiteCache(self.path, {})
+        self.assertEqual(other.get('key'), {'value': 1})
+        other.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_many_add_and_expiry(self):
+        self.cache.set_many({'a': 1, 'b': 'два'})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 'два'})
+        self.assertFalse(self.cache.add('a', 2))
+        self.cache.set('short', 1, timeout=-1)
+        self.assertFalse(self.cache.has_key('short'))
+        self.assertTrue(self.cache.add('short', 2))
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        self.assertEqual(self.cache.decr('counter'), 5)
+        self.cache.set('float', 1.5)
+        self.assertEqual(self.cache.incr('float'), 2.5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        for key in 'abcd':
+            self.cache.set(key, key)
+            time.sleep(0.01)
+        self.cache._db.execute(
+            "UPDATE cache SET accessed = accessed + 100 WHERE key LIKE '%a'")
+        self.cache.set('e', 'e')
+        self.assertTrue(self.cache.has_key('a'))
+        self.assertFalse(self.cache.has_key('b'))
+        self.assertTrue(self.cache.has_key('e'))
+
+
+class GetOrComputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_value_cached(self):
+        calls = []
+        for _ in range(3):
+            value = get_or_compute('swr', lambda: calls.append(1) or 'v', 60)
+        self.assertEqual(value, 'v')
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_served_while_locked(self):
+        """Пока другой клиент пересчитывает, отдаётся устаревшее значение."""
+        cache.set('swr', ('old', time.time() - 1, 0.0), 60)
+        cache.add('swr:lock', 1)
+        self.assertEqual(get_or_compute('swr', lambda: 'new', 60), 'old')
+        cache.delete('swr:lock')
+        self.assertEqual(get_or_compute('swr', lambda: 'new', 60), 'new')
+
+    def test_cold_miss_single_flight(self):
+        """Одновременные промахи по одному ключу пересчитываются один раз."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'v'
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    get_or_compute('swr', compute, 60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['v'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidate_by_tag(self):
+        """Смена версии тега сбрасывает все записи с этим тегом."""
+        get_or_compute('a', lambda: 1, 60, tags=['post:1', 'feed:index'])
+        get_or_compute('b', lambda: 1, 60, tags=['post:2'])
+        invalidate_tags('post:1')
+        self.assertEqual(
+            get_or_compute('a', lambda: 2, 60, tags=['post:1', 'feed:index']),
+            2)
+        self.assertEqual(
+            get_or_compute('b', lambda: 2, 60, tags=['post:2']), 1)
+
+
+class InvalidateOnCommitTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_refill_before_commit_dropped(self):
+        """Запись, закэшированная до фиксации удаления, не переживает её."""
+        get_or_compute('post', lambda: 'пост', 60, tags=['post:1'])
+        with transaction.atomic():
+            invalidate_on_commit('post:1')
+            # Параллельное чтение ещё видит строку и кэширует её снова.
+            get_or_compute('post', lambda: 'пост', 60, tags=['post:1'])
+        self.assertIsNone(
+            get_or_compute('post', lambda: None, 60, tags=['post:1']))
+
+
+class QueryCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_repeated_query_served_from_cache(self):
+        querycache.cached(Group.objects).get(slug='test-slug')
+        with self.assertNumQueries(0):
+            group = querycache.cached(Group.objects).get(slug='test-slug')
+        self.assertEqual(group, self.group)
+
+    def test_write_invalidates_table(self):
+        """Любая запись через ORM, включая update(), сбрасывает таблицу."""
+        groups = querycache.cached(Group.objects.filter(slug='test-slug'))
+        list(groups)
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        self.assertEqual(
+            list(groups.values_list('title', flat=True)),
+            ['Новое название'],
+        )
+
+    def test_write_to_subquery_table_invalidates(self):
+        author = get_user_model().objects.create_user(username='author')
+        reader = get_user_model().objects.create_user(username='reader')
+        Post.objects.create(author=author, text='Пост')
+        feed = querycache.cached(Post.objects.following(reader))
+        self.assertEqual(list(feed), [])
+        Follow.objects.create(user=reader, author=author)
+        feed = querycache.cached(Post.objects.following(reader))
+        self.assertEqual(len(feed), 1)
+
+    def test_not_cached_inside_transaction(self):
+        with transaction.atomic():
+            querycache.cached(Group.objects).get(slug='test-slug')
+            with self.assertNumQueries(1):
+                querycache.cached(Group.objects).get(slug='test-slug')
+
+    @mock.patch.object(querycache, 'STATS_FLUSH', 1)
+    def test_stats(self):
+        querycache._stats.update(hits=0, misses=0)
+        querycache.cached(Group.objects).get(slug='test-slug')
+        querycache.cached(Group.objects).get(slug='test-slug')
+        result = querycache.stats()
+        self.assertEqual((result['hits'], result['misses']), (1, 1))
+
+
+class BufferedCounterTests(TransactionTestCase):
+    def setUp(self):
+        author = get_user_model().objects.create_user(username='author')
+        self.post = Post.objects.create(author=author, text='Пост')
+        self.flushed = []
+        self.counter = BufferedCounter(
+            PostViews, 'count', interval=3600, max_events=3,
+            on_flush=self.flushed.append,
+        )
+
+    def test_batched_flush(self):
+        self.counter.incr(self.post.pk)
+        self.counter.incr(self.post.pk)
+        self.assertFalse(PostViews.objects.exists())
+        self.assertEqual(self.counter.pending_for(self.post.pk), 2)
+        # BEGIN IMMEDIATE и один пакетный INSERT на все ключи.
+        with self.assertNumQueries(2):
+            self.counter.incr(self.post.pk)
+        self.assertEqual(PostViews.objects.get().count, 3)
+        self.assertEqual(self.flushed, [{self.post.pk: 3}])
+
+    def test_deltas_from_workers_add_up(self):
+        other = BufferedCounter(PostViews, 'count')
+        self.counter.incr(self.post.pk, 5)
+        other.incr(self.post.pk, 2)
+        other.flush()
+        self.counter.flush()
+        self.assertEqual(PostViews.objects.get().count, 7)
+
+    def test_idle_buffer_flushed_by_timer(self):
+        counter = BufferedCounter(PostViews, 'count', interval=0.05)
+        counter.incr(self.post.pk, 4)
+        self.assertFalse(PostViews.objects.exists())
+        counter.flusher.timer.join(5)
+        self.assertEqual(PostViews.objects.get().count, 4)
+
+    def test_failed_inline_flush_keeps_deltas(self):
+        """Ошибка сброса из incr() не доходит до запроса."""
+        self.addCleanup(self.counter.flusher.cancel)
+        with mock.patch.object(
+            BufferedCounter, '_sql', return_value='INSERT INTO missing'
+        ):
+            with self.assertLogs('core.counters', 'ERROR'):
+                for _ in range(3):
+                    self.counter.incr(self.post.pk)
+            with self.assertRaises(DatabaseError):
+                self.counter.flush()
+        self.assertEqual(self.counter.pending_for(self.post.pk), 3)
+        self.counter.flush()
+        self.assertEqual(PostViews.objects.get().count, 3)
+
+    def test_deleted_objects_skipped(self):
+        self.counter.incr(self.post.pk)
+        self.counter.incr(self.post.pk + 100)
+        self.counter.flush()
+        self.assertEqual(
+            list(PostViews.objects.values_list('post_id', flat=True)),
+            [self.post.pk],
+        )
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(
+            username='auth', password='old-password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def user_queries(self, url='/about/tech/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "auth_user"' in query['sql']
+        ]
+
+    def test_user_loaded_from_cache(self):
+        self.user_queries()
+        response, queries = self.user_queries()
+        self.assertEqual(queries, [])
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_profile_edit_invalidates(self):
+        self.user_queries()
+        self.user.first_name = 'Иван'
+        self.user.save()
+        response, queries = self.user_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['user'].first_name, 'Иван')
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.user_queries()
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        user.save()
+        response, _ = self.user_queries()
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session['cart'] = [1]
+        self.session.save()
+
+    def session_writes(self, session):
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        return [
+            query['sql'] for query in queries.captured_queries
+            if 'django_session' in query['sql']
+        ]
+
+    def test_unchanged_session_read_from_cache_not_written(self):
+        session = SessionStore(self.session.session_key)
+        with self.assertNumQueries(0):
+            self.assertEqual(session['cart'], [1])
+        self.assertEqual(self.session_writes(session), [])
+        session['cart'] = [1, 2]
+        self.assertEqual(len(self.session_writes(session)), 1)
+        self.assertEqual(
+            SessionStore(self.session.session_key)['cart'], [1, 2])
+
+    def test_expiry_persisted_past_threshold(self):
+        session = SessionStore(self.session.session_key)
+        session.load()
+        later = timezone.now() + timedelta(days=3)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(len(self.session_writes(session)), 1)
+        stored = Session.objects.get(pk=session.session_key)
+        self.assertGreater(
+            stored.expire_date, self.session.get_expiry_date())
+
+    def test_purge_deletes_only_expired(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create([
+            Session(session_key=f'old{number}', session_data='',
+                    expire_date=past)
+            for number in range(5)
+        ])
+        out = StringIO()
+        management.call_command(
+            'purge_sessions', batch_size=2, pause=0, stdout=out)
+        self.assertIn('5', out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            [self.session.session_key],
+        )
+
+
+class PageCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(author=self.author, text='Пост')
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+
+    def post_queries(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.url)
+        return response, [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+
+    def test_shell_shared_holes_personal(self):
+        # Вход обновляет last_login и сбрасывает тег user:<id> автора.
+        author_client = self.client_class()
+        author_client.force_login(self.author)
+        reader_client = self.client_class()
+        reader_client.force_login(self.reader)
+        self.post_queries(self.client)
+
+        response, queries = self.post_queries(author_client)
+        self.assertEqual(queries, [])
+        self.assertContains(response, 'Пользователь: author')
+        self.assertContains(response, 'Редактировать пост')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+        response = reader_client.get(self.url)
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertNotContains(response, 'Редактировать пост')
+        self.assertNotContains(response, '<!--hole:')
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Пользователь:')
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+
+    def test_write_invalidates_shell(self):
+        self.client.get(self.url)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_list_page_reactions_per_user(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        post = Post.objects.create(
+            author=self.author, text='В группе', group=group)
+        like(self.reader, post.pk)
+        url = reverse('posts:group_list', args=[group.slug])
+        self.client.get(url)
+        reader_client = self.client_class()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(url)
+        self.assertContains(response, 'btn btn-primary')
+        self.assertContains(response, 'Все авторы', count=0)
+        response = reader_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Все авторы')
+        self.assertContains(response, 'btn btn-primary')
+        self.assertNotContains(response, '<!--hole:')
+
+    def test_group_rename_invalidates_post_page(self):
+        group = Group.objects.create(title='Старая', slug='old')
+        self.post.group = group
+        self.post.save()
+        self.client.get(self.url)
+        group.title = 'Новая'
+        group.save()
+        self.assertContains(self.client.get(self.url), 'Группа: Новая')
+        group.slug = 'new'
+        group.save()
+        self.client.get(self.url)
+        group.title = 'Третья'
+        group.save()
+        self.assertContains(self.client.get(self.url), 'Группа: Третья')
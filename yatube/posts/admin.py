@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Follow, Group, Post, Comment
+from .models import Comment, Follow, Group, Notification, Post, Recommendation
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -27,3 +27,5 @@ admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(Recommendation)
+admin.site.register(Notification)
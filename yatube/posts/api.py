@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+
+from .models import Comment, Group, Post
+from .utils import PAG_PAGE
+
+User = get_user_model()
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author__username', 'group__slug', 'image',
+)
+COMMENT_FIELDS = ('id', 'post_id', 'author__username', 'text', 'created')
+
+
+class BadCursor(ValueError):
+    pass
+
+
+def encode_cursor(date, pk):
+    raw = f'{date.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        date, pk = raw.decode().split('|')
+        date = parse_datetime(date)
+        pk = int(pk)
+    except ValueError as error:
+        raise BadCursor(cursor) from error
+    if date is None:
+        raise BadCursor(cursor)
+    return date, pk
+
+
+def cursor_page(queryset, cursor, date_field):
+    """Keyset-пагинация по (date_field, pk) в порядке убывания.
+
+    В отличие от OFFSET стоимость страницы не растёт с её номером.
+    """
+    if cursor:
+        date, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': date})
+            | Q(**{date_field: date, 'pk__lt': pk})
+        )
+    rows = list(queryset.order_by(f'-{date_field}', '-pk')[:PAG_PAGE + 1])
+    next_cursor = None
+    if len(rows) > PAG_PAGE:
+        rows = rows[:PAG_PAGE]
+        next_cursor = encode_cursor(rows[-1][date_field], rows[-1]['id'])
+    return rows, next_cursor
+
+
+def json_response(request, data, status=200):
+    """Компактный JSON с ETag: при совпадении If-None-Match — 304."""
+    content = json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
+    etag = '"%s"' % hashlib.md5(content).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            content, status=status, content_type='application/json'
+        )
+    response['ETag'] = etag
+    return response
+
+
+def posts_page(request, queryset):
+    try:
+        rows, next_cursor = cursor_page(
+            queryset.values(*POST_FIELDS), request.GET.get('cursor'),
+            'pub_date',
+        )
+    except BadCursor:
+        return JsonResponse({'detail': 'Некорректный курсор'}, status=400)
+    return json_response(request, {'results': rows, 'next': next_cursor})
+
+
+@require_GET
+def index(request):
+    return posts_page(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return posts_page(request, Post.objects.filter(group=group))
+
+
+@require_GET
+def profile(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return posts_page(request, Post.objects.filter(author=author))
+
+
+@require_GET
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация'}, status=401)
+    return posts_page(request, Post.objects.following(request.user))
+
+
+@require_GET
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.values(*POST_FIELDS), pk=post_id
+    )
+    return json_response(request, post)
+
+
+@require_GET
+def post_comments(request, post_id):
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    comments = Comment.objects.filter(post_id=post_id).values(
+        *COMMENT_FIELDS
+    )
+    try:
+        rows, next_cursor = cursor_page(
+            comments, request.GET.get('cursor'), 'created'
+        )
+    except BadCursor:
+        return JsonResponse({'detail': 'Некорректный курсор'}, status=400)
+    return json_response(request, {'results': rows, 'next': next_cursor})
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name = 'Посты блога'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .tasks import enqueue_stale_rerender
+
+        post_migrate.connect(enqueue_stale_rerender, sender=self)
@@ -0,0 +1,19 @@
+from core.counters import BufferedCounter
+
+from . import trending
+from .models import PostViews
+
+
+def _flushed(counts):
+    for post_id, count in counts.items():
+        trending.record_views(post_id, count)
+
+
+post_views = BufferedCounter(PostViews, 'count', on_flush=_flushed)
+
+
+def view_count(post_id):
+    """Сохранённые просмотры плюс ещё не сброшенные этим процессом."""
+    stored = PostViews.objects.filter(post_id=post_id).values_list(
+        'count', flat=True)[:1]
+    return sum(stored) + post_views.pending_for(post_id)
@@ -0,0 +1,79 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_FIELDS = ('type', 'id', 'post_id', 'group', 'date', 'text')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    """Псевдо-буфер: csv.writer пишет строку, а мы сразу её отдаём."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(author):
+    """Построчно отдаёт посты и комментарии автора.
+
+    Записи читаются через iterator() кусками по EXPORT_CHUNK_SIZE,
+    поэтому в памяти не держится весь результат запроса.
+    """
+    posts = Post.objects.filter(author=author).order_by('pk').values_list(
+        'pk', 'group__slug', 'pub_date', 'text'
+    )
+    for pk, group, pub_date, text in posts.iterator(
+            chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            'type': 'post',
+            'id': pk,
+            'post_id': pk,
+            'group': group or '',
+            'date': pub_date,
+            'text': text,
+        }
+    comments = Comment.objects.filter(author=author).order_by(
+        'pk'
+    ).values_list('pk', 'post_id', 'created', 'text')
+    for pk, post_id, created, text in comments.iterator(
+            chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            'type': 'comment',
+            'id': pk,
+            'post_id': post_id,
+            'group': '',
+            'date': created,
+            'text': text,
+        }
+
+
+def stream_csv(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        row['date'] = row['date'].isoformat()
+        yield writer.writerow(row)
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def stream_export(author, export_format):
+    """Возвращает генератор строк выгрузки в нужном формате."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {export_format}')
+    if export_format == 'csv':
+        return stream_csv(export_rows(author))
+    return stream_jsonl(export_rows(author))
@@ -0,0 +1,157 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+from django.utils.text import Truncator
+
+from core.caching import get_or_compute
+
+from .models import Group, Post
+
+User = get_user_model()
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 15
+
+
+def feed_cache_key(kind, name, flavour):
+    return f'feed:{kind}:{name}:{flavour}'
+
+
+def feed_tags(kind, name):
+    """Теги кэша ленты: 'feed:index', 'group:<slug>', 'author:<username>'."""
+    if kind == 'index':
+        return ['feed:index']
+    return [f'{kind}:{name}']
+
+
+class PostsFeed(Feed):
+    description = 'Последние обновления на сайте'
+
+    def get_queryset(self, obj):
+        return Post.objects.select_related('author', 'group')
+
+    def items(self, obj):
+        return self.get_queryset(obj)[:FEED_SIZE]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(10)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def get_queryset(self, obj):
+        return super().get_queryset(obj).filter(group=obj)
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def get_queryset(self, obj):
+        return super().get_queryset(obj).filter(author=obj)
+
+
+class AtomIndexFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class AtomGroupFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AtomAuthorFeed(AuthorFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+def cached_feed(feed, kind, flavour):
+    """Оборачивает ленту кэшем и условными GET.
+
+    Пока пост не изменился, опрос ленты — одно чтение из кэша,
+    а клиент с актуальным ETag получает 304 без тела. Пересчёт ленты
+    выполняет один клиент, остальные ждут его или получают прежнюю.
+    """
+    def view(request, name=''):
+        def render():
+            args = (name,) if name else ()
+            response = feed(request, *args)
+            content = response.content
+            return (
+                content,
+                response['Content-Type'],
+                '"%s"' % hashlib.md5(content).hexdigest(),
+                response.get('Last-Modified'),
+            )
+
+        content, content_type, etag, last_modified = get_or_compute(
+            feed_cache_key(kind, name, flavour), render, FEED_CACHE_TIMEOUT,
+            tags=feed_tags(kind, name),
+        )
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and parse_http_date_safe(
+                last_modified),
+        )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        return response
+    return view
+
+
+index_rss = cached_feed(IndexFeed(), 'index', 'rss')
+index_atom = cached_feed(AtomIndexFeed(), 'index', 'atom')
+group_rss = cached_feed(GroupFeed(), 'group', 'rss')
+group_atom = cached_feed(AtomGroupFeed(), 'group', 'atom')
+author_rss = cached_feed(AuthorFeed(), 'author', 'rss')
+author_atom = cached_feed(AtomAuthorFeed(), 'author', 'atom')
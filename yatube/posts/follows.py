@@ -0,0 +1,34 @@
+import hashlib
+
+from django.core.cache import cache
+
+from core.caching import tagged_key
+
+from .models import Follow
+
+FOLLOWS_CACHE_TIMEOUT = 60 * 10
+
+
+def resolve_follows(viewer, author_ids):
+    """Подписан ли viewer на каждого из авторов: {author_id: bool}.
+
+    Один запрос на страницу; результат кэшируется для пары
+    (viewer, набор авторов) под тегом follow:<viewer_id>, который
+    сбрасывается при подписке и отписке.
+    """
+    author_ids = sorted(set(author_ids))
+    if not viewer.is_authenticated or not author_ids:
+        return {author_id: False for author_id in author_ids}
+    digest = hashlib.md5(
+        ','.join(map(str, author_ids)).encode()
+    ).hexdigest()
+    key = tagged_key(
+        f'follows:{viewer.pk}:{digest}', [f'follow:{viewer.pk}']
+    )
+    followed = cache.get(key)
+    if followed is None:
+        followed = set(Follow.objects.filter(
+            user=viewer, author_id__in=author_ids
+        ).values_list('author_id', flat=True))
+        cache.set(key, followed, FOLLOWS_CACHE_TIMEOUT)
+    return {author_id: author_id in followed for author_id in author_ids}
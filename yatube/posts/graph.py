@@ -0,0 +1,227 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Follow, FollowChange
+
+# Подсказка для воркеров: id последней записи журнала подписок.
+LAST_CHANGE_KEY = 'followgraph:last_change'
+# Даже без подсказки в кэше граф сверяется с журналом не реже раза в MAX_LAG.
+MAX_LAG = 30
+# Записи журнала старше LOG_RETENTION секунд удаляет prune_log(): все
+# работающие воркеры применили их давно. Воркер, не сверявшийся дольше,
+# пересобирает граф целиком.
+LOG_RETENTION = 10 * MAX_LAG
+# После стольких изменений поверх CSR граф пересобирается целиком.
+REBUILD_THRESHOLD = 10000
+# Дальше этого размера список id в IN (...) заменяется подзапросом.
+MAX_IN_IDS = 900
+
+
+def build_csr(pairs, size):
+    """CSR-представление рёбер: offsets[u]..offsets[u + 1] в targets."""
+    counts = array('q', bytes(8 * (size + 1)))
+    for source, _ in pairs:
+        counts[source + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+    offsets = array('q', counts)
+    targets = array('q', bytes(8 * len(pairs)))
+    for source, target in sorted(pairs):
+        targets[counts[source]] = target
+        counts[source] += 1
+    return offsets, targets
+
+
+class FollowGraph:
+    """Граф подписок на массивах int64 в памяти процесса.
+
+    Основа — две CSR-структуры (подписки и подписчики), индексированные
+    прямо по id пользователя. Изменения поверх них хранятся в множествах
+    added/removed, пока их не станет REBUILD_THRESHOLD.
+    """
+
+    def __init__(self, edges=(), last_change=0):
+        pairs = list(edges)
+        size = max((max(pair) for pair in pairs), default=0) + 1
+        self.size = size
+        self.out_offsets, self.out_targets = build_csr(pairs, size)
+        self.in_offsets, self.in_targets = build_csr(
+            [(author, user) for user, author in pairs], size
+        )
+        self.added = set()
+        self.removed = set()
+        self.last_change = last_change
+
+    def _row(self, offsets, targets, node):
+        if node >= self.size:
+            return targets[0:0]
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def _in_csr(self, user, author):
+        row = self._row(self.out_offsets, self.out_targets, user)
+        i = bisect_left(row, author)
+        return i < len(row) and row[i] == author
+
+    def is_following(self, user, author):
+        if (user, author) in self.added:
+            return True
+        if (user, author) in self.removed:
+            return False
+        return self._in_csr(user, author)
+
+    def followees(self, user):
+        result = {
+            author for author in
+            self._row(self.out_offsets, self.out_targets, user)
+            if (user, author) not in self.removed
+        }
+        result.update(a for u, a in self.added if u == user)
+        return result
+
+    def followees_head(self, user, limit):
+        """Не больше limit подписок user: срез строки CSR без построения
+        полного множества (для «хабов» с огромным числом подписок)."""
+        result = [
+            author for author in
+            self._row(self.out_offsets, self.out_targets, user)[:limit]
+            if (user, author) not in self.removed
+        ]
+        if len(result) < limit:
+            result.extend(a for u, a in self.added if u == user)
+        return result[:limit]
+
+    def followers(self, author):
+        result = {
+            user for user in
+            self._row(self.in_offsets, self.in_targets, author)
+            if (user, author) not in self.removed
+        }
+        result.update(u for u, a in self.added if a == author)
+        return result
+
+    def mutual(self, user):
+        """Пользователи, с которыми подписка взаимная."""
+        return self.followees(user) & self.followers(user)
+
+    def followers_of_followers(self, user):
+        """Подписчики подписчиков, кроме самого пользователя и его
+        прямых подписчиков."""
+        direct = self.followers(user)
+        result = set()
+        for follower in direct:
+            result |= self.followers(follower)
+        return result - direct - {user}
+
+    def apply(self, user, author, added):
+        pair = (user, author)
+        self.added.discard(pair)
+        self.removed.discard(pair)
+        if added and not self._in_csr(user, author):
+            self.added.add(pair)
+        elif not added and self._in_csr(user, author):
+            self.removed.add(pair)
+
+    @property
+    def pending(self):
+        return len(self.added) + len(self.removed)
+
+    @classmethod
+    def load(cls):
+        last = FollowChange.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+        edges = Follow.objects.values_list('user_id', 'author_id').iterator(
+            chunk_size=10000)
+        return cls(edges, last)
+
+
+_graph = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _catch_up(graph):
+    changes = FollowChange.objects.filter(
+        pk__gt=graph.last_change).order_by('pk').values_list(
+        'pk', 'user_id', 'author_id', 'added')
+    for pk, user, author, added in changes:
+        graph.apply(user, author, added)
+        graph.last_change = pk
+
+
+def get_graph():
+    """Граф процесса, догнанный до журнала изменений.
+
+    В установившемся режиме это одно чтение подсказки из кэша;
+    к базе обращаемся, только если журнал ушёл вперёд.
+    """
+    global _graph, _checked_at
+    with _lock:
+        if _graph is None:
+            _graph = FollowGraph.load()
+            _checked_at = time.monotonic()
+            return _graph
+        idle = time.monotonic() - _checked_at
+        if idle > LOG_RETENTION:
+            # Пропущенные записи журнала могли быть уже удалены.
+            _graph = FollowGraph.load()
+            _checked_at = time.monotonic()
+            return _graph
+        hint = cache.get(LAST_CHANGE_KEY)
+        stale = idle > MAX_LAG
+        if stale or (hint is not None and hint > _graph.last_change):
+            _catch_up(_graph)
+            _checked_at = time.monotonic()
+            if _graph.pending > REBUILD_THRESHOLD:
+                _graph = FollowGraph.load()
+        return _graph
+
+
+def record_change(user, author, added):
+    """Пишет изменение в журнал; вызывается из сигналов Follow."""
+    change = FollowChange.objects.create(
+        user_id=user, author_id=author, added=added)
+
+    def publish():
+        if _graph is not None:
+            with _lock:
+                if change.pk > _graph.last_change:
+                    _catch_up(_graph)
+        cache.set(LAST_CHANGE_KEY, change.pk, None)
+
+    transaction.on_commit(publish)
+
+
+def prune_log(retention=LOG_RETENTION, batch_size=1000):
+    """Удаляет записи журнала старше retention секунд; возвращает число.
+
+    Удаление идёт короткими пачками от начала журнала, по первичному
+    ключу, и не держит блокировку записи надолго.
+    """
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    old = FollowChange.objects.filter(created__lt=cutoff).order_by(
+        'pk').values_list('pk', flat=True)
+    deleted = 0
+    while True:
+        ids = list(old[:batch_size])
+        if not ids:
+            return deleted
+        FollowChange.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+
+
+def followee_ids(user):
+    """Id авторов, на которых подписан user, без запроса к базе.
+
+    Внутри транзакции граф не используется: он знает только
+    зафиксированные изменения. Возвращает None, если нужно идти в базу.
+    """
+    if connection.in_atomic_block:
+        return None
+    return get_graph().followees(user.pk)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы постов, сохранённых до появления поля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all', action='store_true', dest='refresh_all',
+            help='Пересчитать анонсы всех постов, а не только пустые.',
+        )
+
+    def handle(self, batch_size, refresh_all, **options):
+        posts = Post.objects.order_by('pk').only('pk', 'text')
+        if not refresh_all:
+            posts = posts.filter(excerpt='')
+        last_pk = 0
+        total = 0
+        while True:
+            # Идём по первичному ключу: каждая пачка — короткая транзакция,
+            # и в памяти не больше batch_size текстов.
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                post.excerpt = make_excerpt(post.text)
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, ['excerpt'])
+            last_pk = batch[-1].pk
+            total += len(batch)
+        self.stdout.write(f'Обновлено анонсов: {total}')
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время ответа и размер HTML-страниц и JSON API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def measure(self, client, url, repeat):
+        size = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            response = client.get(url)
+            content = (
+                b''.join(response.streaming_content)
+                if response.streaming else response.content
+            )
+            size = len(content)
+        return (time.perf_counter() - started) / repeat * 1000, size
+
+    def handle(self, repeat, **options):
+        post = Post.objects.only('pk', 'author__username').select_related(
+            'author').first()
+        if post is None:
+            self.stderr.write('Нет постов для замера.')
+            return
+        pairs = [
+            ('index', reverse('posts:index'), reverse('posts:api_index')),
+            (
+                'profile',
+                reverse('posts:profile', args=[post.author.username]),
+                reverse('posts:api_profile', args=[post.author.username]),
+            ),
+            (
+                'post_detail',
+                reverse('posts:post_detail', args=[post.pk]),
+                reverse('posts:api_post_detail', args=[post.pk]),
+            ),
+        ]
+        client = Client()
+        client.force_login(post.author)
+        self.stdout.write(
+            f'{"view":<12} {"html ms":>9} {"html B":>9} '
+            f'{"json ms":>9} {"json B":>9}'
+        )
+        for name, html_url, api_url in pairs:
+            html_ms, html_size = self.measure(client, html_url, repeat)
+            api_ms, api_size = self.measure(client, api_url, repeat)
+            self.stdout.write(
+                f'{name:<12} {html_ms:>9.2f} {html_size:>9} '
+                f'{api_ms:>9.2f} {api_size:>9}'
+            )
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exports import EXPORT_FORMATS, stream_export
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты и комментарии пользователя в CSV или JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--format', dest='export_format',
+            choices=EXPORT_FORMATS, default='csv',
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+
+    def handle(self, username, export_format, output=None, **options):
+        try:
+            author = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден')
+        if output is None:
+            for line in stream_export(author, export_format):
+                self.stdout.write(line, ending='')
+            return
+        with open(output, 'w', encoding='utf-8', newline='') as file:
+            for line in stream_export(author, export_format):
+                file.write(line)
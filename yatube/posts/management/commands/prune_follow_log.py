@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.queue import enqueue
+from posts.graph import LOG_RETENTION, prune_log
+from posts.tasks import prune_follow_log
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из журнала подписок записи, применённые всеми воркерами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention', type=int, default=LOG_RETENTION,
+            help='Сколько секунд хранить записи журнала.',
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Поставить чистку в очередь фоновых задач.',
+        )
+
+    def handle(self, retention, **options):
+        if options['enqueue']:
+            enqueue(prune_follow_log)
+            self.stdout.write('Чистка поставлена в очередь')
+            return
+        deleted = prune_log(retention)
+        self.stdout.write(f'Удалено записей журнала: {deleted}')
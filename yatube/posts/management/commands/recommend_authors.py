@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.queue import enqueue
+from posts.recommendations import compute_recommendations
+from posts.tasks import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для всех пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Поставить пересчёт в очередь фоновых задач.',
+        )
+
+    def handle(self, **options):
+        if options['enqueue']:
+            enqueue(refresh_recommendations)
+            self.stdout.write('Пересчёт поставлен в очередь')
+            return
+        started = time.monotonic()
+        count = compute_recommendations()
+        self.stdout.write(
+            f'Рекомендации для {count} пользователей '
+            f'за {time.monotonic() - started:.1f} с'
+        )
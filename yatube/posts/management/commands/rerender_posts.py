@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.queue import enqueue
+from posts.tasks import RERENDER_BATCH, rerender_stale
+
+
+class Command(BaseCommand):
+    help = ('Ставит в очередь перерисовку HTML постов и комментариев '
+            'после смены версии рендера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=RERENDER_BATCH
+        )
+
+    def handle(self, batch_size, **options):
+        enqueue(rerender_stale, batch_size)
+        self.stdout.write('Перерисовка поставлена в очередь')
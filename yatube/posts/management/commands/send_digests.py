@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.queue import enqueue
+from posts.notifications import DIGEST_BATCH, send_digests
+from posts.tasks import send_notification_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает дайджесты накопленных уведомлений (запускать по cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DIGEST_BATCH)
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Поставить рассылку в очередь фоновых задач.',
+        )
+
+    def handle(self, batch_size, **options):
+        if options['enqueue']:
+            enqueue(send_notification_digests)
+            self.stdout.write('Рассылка поставлена в очередь')
+            return
+        sent = send_digests(batch_size)
+        self.stdout.write(f'Отправлено дайджестов: {sent}')
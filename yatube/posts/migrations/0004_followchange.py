@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(verbose_name='Подписчик')),
+                ('author_id', models.IntegerField(verbose_name='Автор')),
+                ('added', models.BooleanField(default=True, verbose_name='Подписка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0004_followchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('authors', models.TextField(verbose_name='Авторы')),
+                ('computed', models.DateTimeField(auto_now=True, verbose_name='Дата расчёта')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('score', models.FloatField(db_index=True, verbose_name='Оценка')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViews',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='views', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0007_postviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReactionCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(verbose_name='Шарда')),
+                ('count', models.IntegerField(default=0, verbose_name='Отметки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reaction_counters', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Reaction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reactioncounter',
+            constraint=models.UniqueConstraint(fields=('post', 'shard'), name='unique_reaction_shard'),
+        ),
+        migrations.AddConstraint(
+            model_name='reaction',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_reaction'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:24
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# EXCERPT_LENGTH на момент миграции.
+EXCERPT_LENGTH = 1501
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias).order_by(
+        'pk').only('pk', 'text')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = Truncator(post.text).chars(EXCERPT_LENGTH)
+        Post.objects.using(schema_editor.connection.alias).bulk_update(
+            batch, ['excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_reactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для списков постов, считается при записи', verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
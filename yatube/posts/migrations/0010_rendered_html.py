@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия HTML'),
+        ),
+    ]
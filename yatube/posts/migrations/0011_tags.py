@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_rendered_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCount',
+            fields=[
+                ('tag', models.CharField(max_length=151, primary_key=True, serialize=False, verbose_name='Тег')),
+                ('count', models.IntegerField(db_index=True, default=0, verbose_name='Постов')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TagEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=151, verbose_name='Тег')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_entries', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagentry',
+            index=models.Index(fields=['tag', '-pub_date', '-post'], name='tag_date_post_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagentry',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='unique_post_tag'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.CharField(choices=[('follow', 'подписался на вас'), ('comment', 'прокомментировал ваш пост'), ('mention', 'упомянул вас в посте')], max_length=16, verbose_name='Событие')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('emailed', models.BooleanField(default=False, verbose_name='Отправлено письмом')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Кто')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created'], name='notification_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['emailed', 'recipient'], name='notification_outbox_idx'),
+        ),
+    ]
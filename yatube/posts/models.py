@@ -1,9 +1,31 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.text import Truncator
+
+from .rendering import RENDERER_VERSION, render_text
 
 
 User = get_user_model()
 
+# Длина анонса в списках постов, символов.
+EXCERPT_LENGTH = 1501
+
+
+def make_excerpt(text):
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_list(self):
+        """Посты для лент: без полного текста и HTML, только анонс."""
+        return self.defer('text', 'html')
+
+    def following(self, user):
+        """Посты авторов, на которых подписан пользователь."""
+        return self.filter(
+            author__in=Follow.objects.filter(user=user).values('author')
+        )
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -35,12 +57,44 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для списков постов, считается при записи'
+    )
+    html = models.TextField('HTML текста', blank=True, editable=False)
+    html_version = models.PositiveSmallIntegerField(
+        'Версия HTML', default=0, editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            self.html = render_text(self.text)
+            self.html_version = RENDERER_VERSION
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'html', 'html_version'
+                }
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_date_idx'
+            ),
+        ]
 
 
 class Group(models.Model):
@@ -69,6 +123,10 @@ class Comment(models.Model):
         help_text='Ссылка на пост, к которому оставлен комментарии'
     )
     text = models.TextField(max_length=500)
+    html = models.TextField('HTML текста', blank=True, editable=False)
+    html_version = models.PositiveSmallIntegerField(
+        'Версия HTML', default=0, editable=False
+    )
     created = models.DateTimeField(
         'Дата публикации коммента',
         auto_now_add=True
@@ -77,8 +135,18 @@ class Comment(models.Model):
     def __str__(self) -> str:
         return self.text
 
+    def save(self, *args, **kwargs):
+        self.html = render_text(self.text)
+        self.html_version = RENDERER_VERSION
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', '-created'], name='comment_post_created_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -103,3 +171,226 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=['user', 'author'],
                                     name='unique_follow')
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'
+            ),
+        ]
+
+
+class FollowChange(models.Model):
+    """Журнал изменений подписок для графа подписок в памяти воркеров."""
+    user_id = models.IntegerField('Подписчик')
+    author_id = models.IntegerField('Автор')
+    added = models.BooleanField('Подписка', default=True)
+    created = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    def __str__(self):
+        action = 'подписка' if self.added else 'отписка'
+        return f'{action}: {self.user_id} -> {self.author_id}'
+
+
+class Recommendation(models.Model):
+    """Рекомендованные авторы пользователя, посчитанные офлайн.
+
+    Одна строка на пользователя: id авторов через запятую по убыванию
+    оценки, чтобы страница читала список одним запросом по ключу.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recommendation',
+        verbose_name='Пользователь',
+    )
+    authors = models.TextField('Авторы')
+    computed = models.DateTimeField('Дата расчёта', auto_now=True)
+
+    def author_ids(self):
+        return [int(pk) for pk in self.authors.split(',') if pk]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.authors}'
+
+
+class TrendingScore(models.Model):
+    """Сохранённая оценка популярности поста.
+
+    score — логарифм суммы весов событий, каждое из которых умножено
+    на 2 ** (время / период полураспада). Так оценки постов сравнимы
+    в любой момент и пересчитывать их при старении не нужно.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост',
+    )
+    score = models.FloatField('Оценка', db_index=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class PostViews(models.Model):
+    """Число просмотров поста; пишется пакетами из буфера процесса."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='views',
+        verbose_name='Пост',
+    )
+    count = models.PositiveIntegerField('Просмотры', default=0)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.count}'
+
+
+class Reaction(models.Model):
+    """Отметка «нравится»: не больше одной от пользователя на пост."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пользователь',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пост',
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.post_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_reaction')
+        ]
+
+
+class ReactionCounter(models.Model):
+    """Одна из шардов счётчика отметок поста.
+
+    Отметки пишутся в случайную шарду, чтобы популярный пост не
+    упирался в одну строку; при чтении шарды суммируются.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reaction_counters',
+        verbose_name='Пост',
+    )
+    shard = models.PositiveSmallIntegerField('Шарда')
+    count = models.IntegerField('Отметки', default=0)
+
+    def __str__(self):
+        return f'{self.post_id}[{self.shard}]: {self.count}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'shard'],
+                                    name='unique_reaction_shard')
+        ]
+
+
+class TagEntry(models.Model):
+    """Индекс хэштегов и упоминаний постов.
+
+    tag — имя хэштега в нижнем регистре или '@username' для упоминания.
+    pub_date повторяет дату поста, чтобы лента тега читалась одним
+    диапазоном индекса (tag, pub_date, post).
+    """
+    tag = models.CharField('Тег', max_length=151)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tag_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    def __str__(self):
+        return f'{self.tag}: {self.post_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'],
+                                    name='unique_post_tag')
+        ]
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date', '-post'], name='tag_date_post_idx'
+            ),
+        ]
+
+
+class TagCount(models.Model):
+    """Число постов с хэштегом; обновляется при записи постов."""
+    tag = models.CharField('Тег', max_length=151, primary_key=True)
+    count = models.IntegerField('Постов', default=0, db_index=True)
+
+    def __str__(self):
+        return f'#{self.tag}: {self.count}'
+
+
+class Notification(models.Model):
+    """Событие для пользователя: исходящая очередь уведомлений.
+
+    Строки копятся и уходят письмом-дайджестом пачкой по получателям;
+    emailed отмечает уже отправленные.
+    """
+    FOLLOW = 'follow'
+    COMMENT = 'comment'
+    MENTION = 'mention'
+    VERBS = (
+        (FOLLOW, 'подписался на вас'),
+        (COMMENT, 'прокомментировал ваш пост'),
+        (MENTION, 'упомянул вас в посте'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель',
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Кто',
+    )
+    verb = models.CharField('Событие', max_length=16, choices=VERBS)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='+',
+        verbose_name='Пост',
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+    read = models.BooleanField('Прочитано', default=False)
+    emailed = models.BooleanField('Отправлено письмом', default=False)
+
+    def __str__(self):
+        return f'{self.actor_id} {self.verb} -> {self.recipient_id}'
+
+    class Meta:
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['recipient', '-created'],
+                name='notification_recipient_idx'
+            ),
+            models.Index(
+                fields=['emailed', 'recipient'],
+                name='notification_outbox_idx'
+            ),
+        ]
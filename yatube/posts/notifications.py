@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.urls import reverse
+
+from .models import Notification
+
+# Получателей в одной пачке дайджестов.
+DIGEST_BATCH = 500
+# Счётчик непрочитанного пересчитывается по базе не реже, чем раз
+# в UNREAD_TIMEOUT секунд: прибавка, потерянная в гонке с пересчётом,
+# исправится сама.
+UNREAD_TIMEOUT = 5 * 60
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _bump(user_id, delta):
+    try:
+        cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        # Счётчика нет: при чтении он будет посчитан по базе.
+        pass
+
+
+def notify(recipient_ids, actor, verb, post=None):
+    """Кладёт событие в исходящую очередь каждому получателю, кроме
+    самого автора события."""
+    recipient_ids = set(recipient_ids) - {actor.pk}
+    if not recipient_ids:
+        return
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=recipient_id, actor=actor, verb=verb, post=post
+        )
+        for recipient_id in recipient_ids
+    ])
+
+    def bump():
+        for recipient_id in recipient_ids:
+            _bump(recipient_id, 1)
+
+    transaction.on_commit(bump)
+
+
+def unread_count(user):
+    """Непрочитанные уведомления из счётчика в кэше.
+
+    COUNT(*) выполняется, только если счётчика в кэше нет или он
+    устарел.
+    """
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, read=False).count()
+        cache.add(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def mark_read(user):
+    Notification.objects.filter(recipient=user, read=False).update(read=True)
+    cache.set(_unread_key(user.pk), 0, UNREAD_TIMEOUT)
+
+
+def _digest(recipient, items):
+    lines = []
+    for item in items:
+        line = f'{item.actor.username} {item.get_verb_display()}'
+        if item.post_id is not None:
+            url = reverse('posts:post_detail', args=[item.post_id])
+            line += f': {url}'
+        lines.append(line)
+    return EmailMessage(
+        f'Yatube: новых уведомлений — {len(items)}',
+        '\n'.join(lines),
+        settings.DEFAULT_FROM_EMAIL,
+        [recipient.email],
+    )
+
+
+def send_digests(batch_size=DIGEST_BATCH):
+    """Рассылает накопленные уведомления, по письму на получателя.
+
+    Письма пачки уходят через одно соединение с почтовым сервером;
+    возвращает число писем.
+    """
+    last = Notification.objects.filter(emailed=False).order_by(
+        '-pk').values_list('pk', flat=True).first()
+    if last is None:
+        return 0
+    sent = 0
+    with get_connection() as connection:
+        while True:
+            recipients = list(Notification.objects.filter(
+                emailed=False, pk__lte=last
+            ).order_by('recipient_id').values_list(
+                'recipient_id', flat=True).distinct()[:batch_size])
+            if not recipients:
+                break
+            pending = Notification.objects.filter(
+                emailed=False, pk__lte=last, recipient_id__in=recipients)
+            grouped = defaultdict(list)
+            for item in pending.select_related(
+                    'recipient', 'actor').order_by('pk'):
+                grouped[item.recipient].append(item)
+            messages = [
+                _digest(recipient, items)
+                for recipient, items in grouped.items() if recipient.email
+            ]
+            connection.send_messages(messages)
+            pending.update(emailed=True)
+            sent += len(messages)
+    return sent
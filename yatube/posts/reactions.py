@@ -0,0 +1,102 @@
+import random
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import Reaction, ReactionCounter
+
+# Число строк-шард счётчика на пост.
+SHARDS = 8
+COUNT_TIMEOUT = 60 * 10
+
+
+def _count_key(post_id):
+    return f'reactions:{post_id}'
+
+
+def _add(post_id, delta):
+    shard = random.randrange(SHARDS)
+    counters = ReactionCounter.objects.filter(post_id=post_id, shard=shard)
+    if counters.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ReactionCounter.objects.create(
+                post_id=post_id, shard=shard, count=delta)
+    except IntegrityError:
+        # Шарду успел создать параллельный запрос.
+        counters.update(count=F('count') + delta)
+
+
+def _changed(post_id):
+    # Повтор после коммита: чтение до фиксации могло вернуть старую сумму.
+    cache.delete(_count_key(post_id))
+    transaction.on_commit(lambda: cache.delete(_count_key(post_id)))
+
+
+def like(user, post_id):
+    """Ставит отметку; повторный вызов ничего не меняет.
+
+    Возвращает True, если отметка появилась.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Reaction.objects.create(user=user, post_id=post_id)
+        except IntegrityError:
+            return False
+        _add(post_id, 1)
+        _changed(post_id)
+    return True
+
+
+def unlike(user, post_id):
+    """Снимает отметку; повторный вызов ничего не меняет."""
+    with transaction.atomic():
+        deleted, _ = Reaction.objects.filter(
+            user=user, post_id=post_id).delete()
+        if not deleted:
+            return False
+        _add(post_id, -1)
+        _changed(post_id)
+    return True
+
+
+def reaction_counts(post_ids):
+    """Число отметок постов: {post_id: count}.
+
+    Счётчики берутся из кэша, промахи — одним запросом по шардам.
+    """
+    post_ids = list(post_ids)
+    found = cache.get_many([_count_key(pk) for pk in post_ids])
+    counts = {pk: found.get(_count_key(pk)) for pk in post_ids}
+    missing = [pk for pk, count in counts.items() if count is None]
+    if missing:
+        sums = dict(ReactionCounter.objects.filter(
+            post_id__in=missing).values('post_id').annotate(
+            total=Sum('count')).values_list('post_id', 'total'))
+        for pk in missing:
+            counts[pk] = sums.get(pk, 0)
+        cache.set_many(
+            {_count_key(pk): counts[pk] for pk in missing}, COUNT_TIMEOUT)
+    return counts
+
+
+def reaction_state(viewer, posts):
+    """Отметки страницы: {post_id: {'count': int, 'liked': bool}}.
+
+    Не больше двух запросов на страницу: суммы шард и отметки зрителя.
+    """
+    post_ids = [post.pk for post in posts]
+    if not post_ids:
+        return {}
+    counts = reaction_counts(post_ids)
+    liked = set()
+    if viewer.is_authenticated:
+        liked = set(Reaction.objects.filter(
+            user=viewer, post_id__in=post_ids
+        ).values_list('post_id', flat=True))
+    return {
+        pk: {'count': counts[pk], 'liked': pk in liked} for pk in post_ids
+    }
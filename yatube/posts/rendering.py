@@ -0,0 +1,52 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.html import linebreaks, urlize
+
+# Увеличивается при любом изменении разметки: записи со старой версией
+# перерисовывает фоновая задача rerender_stale.
+RENDERER_VERSION = 2
+
+# @username не внутри адреса почты или ссылки.
+MENTION_RE = re.compile(r'(?<![\w@./-])@(\w(?:[\w.+-]*\w)?)')
+# #тег не внутри ссылки или HTML-сущности вроде &#39;.
+HASHTAG_RE = re.compile(r'(?<![\w&/#=?])#(\w{1,150})')
+
+
+def link_mentions(html):
+    names = set(MENTION_RE.findall(html))
+    if not names:
+        return html
+    existing = set(get_user_model().objects.filter(
+        username__in=names).values_list('username', flat=True))
+
+    def replace(match):
+        name = match.group(1)
+        if name not in existing:
+            return match.group(0)
+        url = reverse('posts:profile', args=[name])
+        return f'<a href="{url}">@{name}</a>'
+
+    return MENTION_RE.sub(replace, html)
+
+
+def link_hashtags(html):
+    def replace(match):
+        url = reverse('posts:tag', args=[match.group(1).lower()])
+        return f'<a href="{url}">#{match.group(1)}</a>'
+
+    return HASHTAG_RE.sub(replace, html)
+
+
+def render_text(text):
+    """Безопасный HTML из текста пользователя.
+
+    Исходный текст целиком экранируется (urlize с autoescape), поэтому
+    вся разметка в результате — только наша: ссылки, упоминания,
+    хэштеги и абзацы.
+    """
+    html = urlize(text, nofollow=True, autoescape=True)
+    html = link_mentions(html)
+    html = link_hashtags(html)
+    return linebreaks(html)
@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from core.caching import invalidate_on_commit
+
+from . import graph, trending
+from .models import Comment, Follow, Group, Notification, Post
+from .notifications import notify
+from .tags import index_post, unindex_post
+
+# Теги кэша, которые сбрасываются при записи моделей:
+#   feed:index — главная лента и её RSS/Atom;
+#   post:<id> — всё, что показывает пост и его комментарии;
+#   author:<username> — лента и профиль автора;
+#   group:<slug> — лента группы;
+#   follow:<user_id> — лента подписок пользователя.
+# Теги сбрасываются и сразу, и после фиксации транзакции: иначе
+# параллельное чтение успело бы закэшировать удалённую строку.
+
+
+@receiver(post_init, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    if 'group_id' not in instance.get_deferred_fields():
+        instance._initial_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    tags = [
+        'feed:index',
+        f'post:{instance.pk}',
+        f'author:{instance.author.username}',
+    ]
+    group_ids = {
+        instance.group_id, getattr(instance, '_initial_group_id', None)
+    } - {None}
+    if group_ids:
+        # Пост мог перейти в другую группу: сбрасываем обе.
+        slugs = Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True)
+        tags.extend(f'group:{slug}' for slug in slugs)
+    invalidate_on_commit(*tags)
+    instance._initial_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def index_post_tags(sender, instance, **kwargs):
+    if 'text' not in instance.get_deferred_fields():
+        index_post(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def unindex_post_tags(sender, instance, **kwargs):
+    unindex_post(instance)
+
+
+@receiver(post_init, sender=Group)
+def remember_group_slug(sender, instance, **kwargs):
+    if 'slug' not in instance.get_deferred_fields():
+        instance._initial_slug = instance.slug
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    # При смене slug страницы и ленты остались под старым адресом.
+    slugs = {instance.slug, getattr(instance, '_initial_slug', None)}
+    invalidate_on_commit(*(f'group:{slug}' for slug in slugs - {None}))
+    if len(slugs - {None}) > 1 and instance.pk is not None:
+        # Страницы постов помнят slug группы под тегом post:<id>.
+        post_ids = Post.objects.filter(group=instance).values_list(
+            'pk', flat=True)
+        invalidate_on_commit(*(f'post:{pk}' for pk in post_ids))
+    instance._initial_slug = instance.slug
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate_on_commit(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Comment)
+def track_comment(sender, instance, created, **kwargs):
+    # Откаченный комментарий не должен поднимать пост в популярном.
+    if created and instance.post_id is not None:
+        post_id = instance.post_id
+        transaction.on_commit(lambda: trending.record_comment(post_id))
+        notify(
+            [instance.post.author_id], instance.author,
+            Notification.COMMENT, instance.post,
+        )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    invalidate_on_commit(f'follow:{instance.user_id}')
+
+
+@receiver(post_save, sender=Follow)
+def log_follow(sender, instance, created, **kwargs):
+    if created:
+        graph.record_change(instance.user_id, instance.author_id, True)
+        notify([instance.author_id], instance.user, Notification.FOLLOW)
+
+
+@receiver(post_delete, sender=Follow)
+def log_unfollow(sender, instance, **kwargs):
+    graph.record_change(instance.user_id, instance.author_id, False)
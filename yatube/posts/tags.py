@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+
+from .api import decode_cursor, encode_cursor
+from .models import Notification, Post, TagCount, TagEntry
+from .notifications import notify
+from .rendering import HASHTAG_RE, MENTION_RE
+from .utils import PAG_PAGE
+
+TOP_TAGS = 10
+
+
+def extract_tags(text):
+    """Хэштеги (в нижнем регистре) и '@username' существующих авторов."""
+    tags = {tag.lower() for tag in HASHTAG_RE.findall(text)}
+    names = set(MENTION_RE.findall(text))
+    if names:
+        tags.update(
+            f'@{name}' for name in get_user_model().objects.filter(
+                username__in=names).values_list('username', flat=True)
+        )
+    return tags
+
+
+def _hashtags(tags):
+    return [tag for tag in tags if not tag.startswith('@')]
+
+
+def _count(tags, delta):
+    tags = _hashtags(tags)
+    if not tags:
+        return
+    if delta > 0:
+        TagCount.objects.bulk_create(
+            [TagCount(tag=tag) for tag in tags], ignore_conflicts=True)
+    TagCount.objects.filter(tag__in=tags).update(count=F('count') + delta)
+
+
+def index_post(post):
+    """Приводит индекс тегов поста в соответствие с его текстом.
+
+    Меняются только разница со старым набором и счётчики этих тегов;
+    новые упоминания попадают в очередь уведомлений.
+    """
+    wanted = extract_tags(post.text)
+    existing = set(TagEntry.objects.filter(post=post).values_list(
+        'tag', flat=True))
+    added, removed = wanted - existing, existing - wanted
+    if removed:
+        TagEntry.objects.filter(post=post, tag__in=removed).delete()
+        _count(removed, -1)
+    if added:
+        TagEntry.objects.bulk_create([
+            TagEntry(tag=tag, post=post, pub_date=post.pub_date)
+            for tag in added
+        ])
+        _count(added, 1)
+    mentioned = [tag[1:] for tag in added if tag.startswith('@')]
+    if mentioned:
+        notify(
+            get_user_model().objects.filter(
+                username__in=mentioned).values_list('pk', flat=True),
+            post.author, Notification.MENTION, post,
+        )
+
+
+def unindex_post(post):
+    """Уменьшает счётчики тегов удаляемого поста (строки индекса
+    удалит каскад)."""
+    _count(TagEntry.objects.filter(post=post).values_list(
+        'tag', flat=True), -1)
+
+
+def tag_page(tag, cursor=None):
+    """Страница ленты тега: один проход по индексу (tag, pub_date, post)
+    и выборка постов по первичному ключу.
+
+    Возвращает (посты, курсор следующей страницы или None); неверный
+    курсор — BadCursor.
+    """
+    entries = TagEntry.objects.filter(tag=tag)
+    if cursor:
+        date, pk = decode_cursor(cursor)
+        entries = entries.filter(
+            Q(pub_date__lt=date) | Q(pub_date=date, post_id__lt=pk))
+    rows = list(entries.order_by('-pub_date', '-post_id').values_list(
+        'post_id', 'pub_date')[:PAG_PAGE + 1])
+    next_cursor = None
+    if len(rows) > PAG_PAGE:
+        rows = rows[:PAG_PAGE]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    found = Post.objects.select_related('author', 'group').for_list(
+    ).in_bulk([post_id for post_id, _ in rows])
+    posts = [found[post_id] for post_id, _ in rows if post_id in found]
+    return posts, next_cursor
+
+
+def top_tags(limit=TOP_TAGS):
+    return TagCount.objects.filter(count__gt=0).order_by('-count')[:limit]
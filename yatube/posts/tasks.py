@@ -0,0 +1,101 @@
+from django.apps import apps as global_apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, transaction
+from sorl.thumbnail import get_thumbnail
+
+from core.models import Job
+from core.queue import enqueue, task
+
+from .graph import prune_log
+from .models import Comment, Post
+from .notifications import send_digests
+from .recommendations import compute_recommendations
+from .rendering import RENDERER_VERSION, render_text
+
+# Размеры превью, которые используются в шаблонах постов.
+THUMBNAIL_SIZES = ('960x339', '240x339')
+
+
+@task
+def warm_thumbnails(post_id):
+    """Заранее строит превью картинки, чтобы страница их не генерировала."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    for size in THUMBNAIL_SIZES:
+        get_thumbnail(post.image, size, crop='center', upscale=True)
+
+
+@task
+def refresh_recommendations():
+    """Пересчёт рекомендаций авторов; ставится в очередь по расписанию."""
+    return compute_recommendations()
+
+
+@task
+def prune_follow_log():
+    """Чистка журнала подписок; ставится в очередь по расписанию."""
+    return prune_log()
+
+
+RERENDER_BATCH = 200
+
+
+@task
+def rerender_stale(batch_size=RERENDER_BATCH):
+    """Перерисовывает HTML, сохранённый старой версией рендера.
+
+    Обрабатывает одну пачку постов и комментариев и ставит себя
+    в очередь снова, пока устаревшие записи не закончатся.
+    """
+    remaining = False
+    for model in (Post, Comment):
+        batch = list(model.objects.filter(
+            html_version__lt=RENDERER_VERSION
+        ).order_by('pk').only('pk', 'text')[:batch_size])
+        for item in batch:
+            item.html = render_text(item.text)
+            item.html_version = RENDERER_VERSION
+        with transaction.atomic():
+            model.objects.bulk_update(batch, ['html', 'html_version'])
+        remaining = remaining or len(batch) == batch_size
+    if remaining:
+        enqueue(rerender_stale, batch_size)
+
+
+def _rendered_html_migrated(apps):
+    """Есть ли в схеме после migrate очередь задач и поля html_version."""
+    try:
+        apps.get_model('core', 'Job')
+        for name in ('Post', 'Comment'):
+            apps.get_model('posts', name)._meta.get_field('html_version')
+    except (LookupError, FieldDoesNotExist):
+        return False
+    return True
+
+
+def enqueue_stale_rerender(using=DEFAULT_DB_ALIAS, apps=global_apps,
+                           **kwargs):
+    """Обработчик post_migrate: ставит rerender_stale после обновления
+    рендера.
+
+    Выкладка проходит через migrate, поэтому HTML старой версии не
+    остаётся без задачи на перерисовку. Повторно задача не ставится,
+    пока прежняя ещё в очереди. После частичного migrate или отката,
+    когда в схеме ещё нет html_version, ничего не делает.
+    """
+    if using != DEFAULT_DB_ALIAS or not _rendered_html_migrated(apps):
+        return
+    if Job.objects.filter(name=rerender_stale.task_name).exists():
+        return
+    if any(
+        model.objects.filter(html_version__lt=RENDERER_VERSION).exists()
+        for model in (Post, Comment)
+    ):
+        enqueue(rerender_stale)
+
+
+@task
+def send_notification_digests():
+    """Периодическая рассылка дайджестов уведомлений."""
+    return send_digests()
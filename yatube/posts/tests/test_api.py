@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Тестовый пост{i}', group=cls.group)
+            for i in range(13)
+        ])
+        cls.post = Post.objects.first()
+        Comment.objects.create(
+            author=cls.reader, post=cls.post, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_cursor_paging(self):
+        """Ленты отдают страницу и курсор, вторая страница — остаток."""
+        urls = [
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.reader_client.get(url).json()
+                self.assertEqual(len(data['results']), 10)
+                self.assertEqual(data['results'][0]['id'], self.post.pk)
+                data = self.reader_client.get(
+                    url, {'cursor': data['next']}).json()
+                self.assertEqual(len(data['results']), 3)
+                self.assertIsNone(data['next'])
+
+    def test_post_detail_and_comments(self):
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=[self.post.pk])).json()
+        self.assertEqual(data['author__username'], self.author.username)
+        data = self.client.get(
+            reverse('posts:api_post_comments', args=[self.post.pk])).json()
+        self.assertEqual(data['results'][0]['text'], 'Комментарий')
+
+    def test_etag_not_modified(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_bad_cursor_and_anonymous_follow(self):
+        response = self.client.get(
+            reverse('posts:api_index'), {'cursor': 'мусор'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.client.get(reverse('posts:api_follow_index'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
@@ -0,0 +1,79 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.comment = Comment.objects.create(
+            author=cls.author,
+            post=cls.post,
+            text='Тестовый комментарий',
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.url = reverse('posts:profile_export', args=[self.author])
+
+    def test_export_csv(self):
+        """Автор получает потоковую выгрузку в CSV."""
+        response = self.author_client.get(self.url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        lines = content.splitlines()
+        self.assertEqual(lines[0], 'type,id,post_id,group,date,text')
+        self.assertEqual(len(lines), 3)
+        self.assertIn('Тестовый комментарий', content)
+
+    def test_export_jsonl(self):
+        """Выгрузка в JSONL: одна запись на строку."""
+        response = self.author_client.get(self.url, {'format': 'jsonl'})
+        rows = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual([row['type'] for row in rows], ['post', 'comment'])
+        self.assertEqual(rows[0]['group'], self.group.slug)
+        self.assertEqual(rows[1]['post_id'], self.post.pk)
+
+    def test_export_forbidden_for_stranger(self):
+        """Чужой пользователь не может выгрузить данные автора."""
+        client = Client()
+        client.force_login(self.stranger)
+        response = client.get(self.url)
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[self.author]))
+
+    def test_export_unknown_format(self):
+        response = self.author_client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_export_command(self):
+        """Команда export_user пишет выгрузку в stdout."""
+        out = StringIO()
+        call_command('export_user', 'author', '--format=jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_available(self):
+        """Ленты сайта, группы и автора отдают RSS и Atom."""
+        urls = {
+            reverse('posts:feed_index_rss'): '<rss',
+            reverse('posts:feed_index_atom'): '<feed',
+            reverse('posts:feed_group_rss', args=[self.group.slug]): '<rss',
+            reverse('posts:feed_group_atom', args=[self.group.slug]): '<feed',
+            reverse('posts:feed_author_rss', args=[self.author]): '<rss',
+            reverse('posts:feed_author_atom', args=[self.author]): '<feed',
+        }
+        for url, tag in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, tag)
+                self.assertContains(response, 'Тестовый пост')
+
+    def test_unknown_group_feed(self):
+        response = self.client.get(
+            reverse('posts:feed_group_rss', args=['no-such-group']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_get(self):
+        """Клиент с актуальным ETag получает 304."""
+        url = reverse('posts:feed_index_rss')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_feed_invalidated_on_post_write(self):
+        """Новый пост сбрасывает кэш ленты."""
+        url = reverse('posts:feed_group_rss', args=[self.group.slug])
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(
+            author=self.author, text='Новый пост', group=self.group)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новый пост')
+
+    def test_group_slug_change_invalidates_old_feed(self):
+        url = reverse('posts:feed_group_rss', args=[self.group.slug])
+        self.client.get(url)
+        self.group.slug = 'new-slug'
+        self.group.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
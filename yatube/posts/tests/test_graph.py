@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import recommendations
+from ..graph import LOG_RETENTION, FollowGraph, _catch_up, prune_log
+from ..models import (
+    Comment, Follow, FollowChange, Post, Recommendation
+)
+from ..recommendations import compute_recommendations, recommended_authors
+
+User = get_user_model()
+
+
+class FollowGraphTests(SimpleTestCase):
+    def setUp(self):
+        # 1 -> 2, 1 -> 3, 2 -> 1, 4 -> 2
+        self.graph = FollowGraph([(1, 2), (1, 3), (2, 1), (4, 2)])
+
+    def test_adjacency(self):
+        self.assertEqual(self.graph.followees(1), {2, 3})
+        self.assertEqual(self.graph.followers(2), {1, 4})
+        self.assertEqual(self.graph.followees_head(1, 1), [2])
+        self.assertEqual(self.graph.followees(99), set())
+        self.assertTrue(self.graph.is_following(4, 2))
+        self.assertFalse(self.graph.is_following(2, 4))
+
+    def test_mutual_and_followers_of_followers(self):
+        self.assertEqual(self.graph.mutual(1), {2})
+        # Подписчики 1 — {2}, подписчики 2 — {1, 4}.
+        self.assertEqual(self.graph.followers_of_followers(1), {4})
+
+    def test_apply_delta(self):
+        self.graph.apply(3, 4, True)
+        self.graph.apply(1, 2, False)
+        self.assertEqual(self.graph.followees(3), {4})
+        self.assertEqual(self.graph.followers(2), {4})
+        self.assertFalse(self.graph.is_following(1, 2))
+        # Повторная подписка отменяет удаление, а не копит изменения.
+        self.graph.apply(1, 2, True)
+        self.assertTrue(self.graph.is_following(1, 2))
+        self.assertEqual(self.graph.pending, 1)
+
+
+class FollowChangeLogTests(TestCase):
+    def test_follow_writes_log_and_graph_catches_up(self):
+        user = User.objects.create_user(username='user')
+        author = User.objects.create_user(username='author')
+        graph = FollowGraph.load()
+        follow = Follow.objects.create(user=user, author=author)
+        follow.delete()
+        self.assertEqual(
+            list(FollowChange.objects.values_list('added', flat=True)),
+            [True, False],
+        )
+        _catch_up(graph)
+        self.assertFalse(graph.is_following(user.pk, author.pk))
+        self.assertEqual(graph.last_change, FollowChange.objects.last().pk)
+
+    def test_prune_keeps_recent_changes(self):
+        user = User.objects.create_user(username='user')
+        author = User.objects.create_user(username='author')
+        Follow.objects.create(user=user, author=author)
+        old = FollowChange.objects.get()
+        FollowChange.objects.filter(pk=old.pk).update(
+            created=old.created - timedelta(seconds=LOG_RETENTION + 1))
+        Follow.objects.filter(user=user).delete()
+        self.assertEqual(prune_log(batch_size=1), 1)
+        self.assertEqual(
+            list(FollowChange.objects.values_list('added', flat=True)),
+            [False],
+        )
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.viewer = User.objects.create_user(username='viewer')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.viewer, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        post = Post.objects.create(author=cls.other, text='Пост')
+        Comment.objects.create(author=cls.friend, post=post, text='Текст')
+
+    def test_common_neighbors_and_comments(self):
+        compute_recommendations()
+        self.assertEqual(
+            Recommendation.objects.get(user=self.viewer).author_ids(),
+            [self.author.pk, self.other.pk],
+        )
+        with self.assertNumQueries(2):
+            authors = recommended_authors(self.viewer)
+        self.assertEqual(authors, [self.author, self.other])
+
+    def test_followed_authors_are_hidden(self):
+        compute_recommendations()
+        Follow.objects.create(user=self.viewer, author=self.author)
+        self.assertEqual(recommended_authors(self.viewer), [self.other])
+
+    @mock.patch.object(recommendations, 'BATCH_SIZE', 1)
+    def test_rewritten_in_batches(self):
+        Recommendation.objects.create(user=self.other, authors='1')
+        with CaptureQueriesContext(connection) as queries:
+            compute_recommendations()
+        # Пачка из одного пользователя — отдельный DELETE на каждую.
+        deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE')
+        ]
+        self.assertGreater(len(deletes), 2)
+        self.assertEqual(
+            Recommendation.objects.get(user=self.viewer).author_ids(),
+            [self.author.pk, self.other.pk],
+        )
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.other).exists())
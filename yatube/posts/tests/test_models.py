@@ -1,7 +1,12 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import EXCERPT_LENGTH, Group, Post
 
 User = get_user_model()
 
@@ -56,3 +61,31 @@ class PostModelTest(TestCase):
             with self.subTest(value=value):
                 self.assertEqual(
                     task._meta.get_field(value).help_text, expected)
+
+    def test_excerpt_computed_on_save(self):
+        """Анонс считается при записи и обновляется вместе с текстом."""
+        post = Post.objects.create(author=self.user, text='а' * 2000)
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        post.text = 'Короткий'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Короткий')
+
+    def test_backfill_excerpts(self):
+        Post.objects.filter(pk=self.post.pk).update(excerpt='')
+        call_command('backfill_excerpts', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, 'Тестовый пост')
+
+    def test_empty_excerpt_falls_back_to_text(self):
+        """Пост без анонса показывается в лентах по тексту."""
+        Post.objects.filter(pk=self.post.pk).update(
+            excerpt='', group=self.group)
+        cache.clear()
+        urls = (
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:group_list', args=[self.group.slug]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Тестовый пост')
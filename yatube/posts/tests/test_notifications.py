@@ -0,0 +1,85 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Notification, Post
+from ..notifications import UNREAD_TIMEOUT, send_digests, unread_count
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com')
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_events_recorded_in_outbox(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Comment.objects.create(
+            author=self.reader, post=self.post, text='Комментарий')
+        # Свой комментарий уведомления не создаёт.
+        Comment.objects.create(author=self.author, post=self.post, text='Я')
+        self.assertEqual(
+            sorted(Notification.objects.values_list('verb', flat=True)),
+            [Notification.COMMENT, Notification.FOLLOW],
+        )
+        self.assertEqual(unread_count(self.author), 2)
+
+    def test_unread_served_from_counter(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        unread_count(self.author)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author), 1)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['notifications']), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author), 0)
+
+    def test_lost_bump_corrected_by_recount(self):
+        """Уведомление, не попавшее в счётчик, учтётся при пересчёте."""
+        unread_count(self.author)
+        # Как в гонке с пересчётом: строка есть, прибавки к счётчику нет.
+        Notification.objects.create(
+            recipient=self.author, actor=self.reader,
+            verb=Notification.FOLLOW,
+        )
+        self.assertEqual(unread_count(self.author), 0)
+        later = time.time() + UNREAD_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            self.assertEqual(unread_count(self.author), 1)
+
+    def test_digest_one_email_per_recipient_one_connection(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Comment.objects.create(author=self.reader, post=self.post, text='1')
+        Comment.objects.create(author=self.author, post=self.post,
+                               text='@reader')
+        Post.objects.create(author=self.author, text='Привет, @reader')
+        with mock.patch(
+            'posts.notifications.get_connection',
+            wraps=mail.get_connection,
+        ) as get_connection:
+            self.assertEqual(send_digests(batch_size=1), 2)
+        get_connection.assert_called_once()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['author@example.com', 'reader@example.com'],
+        )
+        self.assertIn('подписался на вас', mail.outbox[0].body
+                      + mail.outbox[1].body)
+        self.assertFalse(Notification.objects.filter(emailed=False).exists())
+        self.assertEqual(send_digests(), 0)
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Таблицы, в которых полный просмотр недопустим.
+CHECKED_TABLES = (
+    'posts_post', 'posts_comment', 'posts_follow', 'posts_tagentry',
+)
+
+# Лента подписок сливает уже упорядоченные по индексу посты нескольких
+# авторов, поэтому сортировка здесь неизбежна и ограничена их постами.
+ALLOWED_STEPS = {
+    'posts:follow_index': {'USE TEMP B-TREE FOR ORDER BY'},
+}
+
+# Таблица и индекс, по которому читается страница ленты: индекс в
+# нужном порядке отдаёт строки без сортировки. Имя индекса, созданного
+# Django по db_index, заканчивается хэшем, поэтому сравнивается начало.
+EXPECTED_INDEXES = {
+    'posts:index': ('posts_post', 'posts_post_pub_date_'),
+    'posts:group_list': ('posts_post', 'post_group_date_idx'),
+    'posts:profile': ('posts_post', 'post_author_date_idx'),
+    'posts:post_detail': ('posts_comment', 'comment_post_created_idx'),
+    'posts:tag': ('posts_tagentry', 'tag_date_post_idx'),
+}
+
+
+def plan_steps(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def bad_plan_steps(sql, allowed=()):
+    """Шаги EXPLAIN QUERY PLAN с полным просмотром или сортировкой."""
+    bad = []
+    for step in plan_steps(sql):
+        if step in allowed:
+            continue
+        if 'TEMP B-TREE' in step:
+            bad.append(step)
+        elif (
+            step.startswith('SCAN')
+            and any(table in step for table in CHECKED_TABLES)
+            and 'INDEX' not in step
+        ):
+            bad.append(step)
+    return bad
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Тестовый пост{i}', group=cls.group)
+            for i in range(15)
+        ])
+        Post.objects.create(author=cls.author, text='#тег')
+        cls.post = Post.objects.first()
+        Comment.objects.create(
+            author=cls.reader, post=cls.post, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.urls = {
+            'posts:index': (),
+            'posts:group_list': (self.group.slug,),
+            'posts:profile': (self.author.username,),
+            'posts:post_detail': (self.post.pk,),
+            'posts:follow_index': (),
+            'posts:tag': ('тег',),
+        }
+
+    def test_views_use_indexes(self):
+        """Запросы лент и поста не просматривают таблицы целиком
+        и не сортируют во временном B-дереве."""
+        for view_name, args in self.urls.items():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(view_name, args=args))
+            allowed = ALLOWED_STEPS.get(view_name, set())
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                with self.subTest(view_name=view_name, sql=sql):
+                    self.assertEqual(bad_plan_steps(sql, allowed), [])
+
+    def test_feeds_read_in_index_order(self):
+        """Страница ленты читается по своему составному индексу."""
+        for view_name, (table, index) in EXPECTED_INDEXES.items():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(view_name, args=self.urls[view_name]))
+            plans = [
+                plan_steps(query['sql'])
+                for query in queries.captured_queries
+                if query['sql'].startswith('SELECT')
+                and f'FROM "{table}"' in query['sql']
+                and 'ORDER BY' in query['sql']
+            ]
+            with self.subTest(view_name=view_name):
+                self.assertTrue(plans)
+                for steps in plans:
+                    self.assertTrue(any(
+                        step.startswith(('SEARCH', 'SCAN'))
+                        and f' {table} ' in f'{step} '
+                        and f'INDEX {index}' in step
+                        for step in steps
+                    ), steps)
+                    self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', steps)
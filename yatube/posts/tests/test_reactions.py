@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, Reaction, ReactionCounter
+from ..reactions import SHARDS, like, reaction_state, unlike
+
+User = get_user_model()
+
+
+class ReactionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.other = Post.objects.create(author=cls.author, text='Другой')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_like_is_idempotent(self):
+        self.assertTrue(like(self.reader, self.post.pk))
+        self.assertFalse(like(self.reader, self.post.pk))
+        self.assertEqual(Reaction.objects.count(), 1)
+        self.assertTrue(unlike(self.reader, self.post.pk))
+        self.assertFalse(unlike(self.reader, self.post.pk))
+        self.assertEqual(reaction_state(self.reader, [self.post]), {
+            self.post.pk: {'count': 0, 'liked': False},
+        })
+
+    def test_shards_summed_on_read(self):
+        for number in range(20):
+            user = User.objects.create_user(username=f'user{number}')
+            like(user, self.post.pk)
+        self.assertLessEqual(
+            ReactionCounter.objects.filter(post=self.post).count(), SHARDS)
+        like(self.reader, self.post.pk)
+        with self.assertNumQueries(2):
+            state = reaction_state(self.reader, [self.post, self.other])
+        self.assertEqual(state[self.post.pk], {'count': 21, 'liked': True})
+        self.assertEqual(state[self.other.pk], {'count': 0, 'liked': False})
+        # Суммы закэшированы: остаётся только запрос отметок зрителя.
+        with self.assertNumQueries(1):
+            reaction_state(self.reader, [self.post, self.other])
+
+    def test_toggle_endpoints(self):
+        url = reverse('posts:post_like', args=[self.post.pk])
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+        response = self.client.post(url, {'next': '/group/test/'})
+        self.assertRedirects(
+            response, '/group/test/', fetch_redirect_response=False)
+        self.client.post(url)
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        self.assertEqual(
+            response.context['reactions'][self.post.pk],
+            {'count': 1, 'liked': True},
+        )
+        self.client.post(reverse('posts:post_unlike', args=[self.post.pk]))
+        self.assertFalse(Reaction.objects.exists())
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+
+from core.models import Job
+
+from .. import rendering, tasks
+from ..models import Comment, Post
+from ..rendering import RENDERER_VERSION, render_text
+
+User = get_user_model()
+
+
+class RenderTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+
+    def test_escapes_and_links(self):
+        html = render_text(
+            '<script>alert(1)</script>\n\nсм. https://example.com/a?b=1'
+        )
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;', html)
+        self.assertIn(
+            '<a href="https://example.com/a?b=1" rel="nofollow">', html)
+        self.assertEqual(html.count('<p>'), 2)
+
+    def test_mentions_only_existing_users(self):
+        html = render_text('@ivan и @nobody, почта ivan@example.com')
+        self.assertIn('<a href="/profile/ivan/">@ivan</a>', html)
+        self.assertIn('@nobody', html)
+        self.assertNotIn('/profile/nobody/', html)
+        self.assertNotIn('/profile/example.com/', html)
+
+    def test_hashtags_linked(self):
+        html = render_text('#Django, но не https://example.com/#frag')
+        self.assertIn('<a href="/tag/django/">#Django</a>', html)
+        self.assertNotIn('/tag/frag/', html)
+
+    def test_rendered_on_save(self):
+        post = Post.objects.create(author=self.user, text='Привет, @ivan')
+        comment = Comment.objects.create(
+            author=self.user, post=post, text='a\nb')
+        self.assertIn('/profile/ivan/', post.html)
+        self.assertEqual(post.html_version, RENDERER_VERSION)
+        self.assertEqual(comment.html, '<p>a<br>b</p>')
+
+    def test_rerender_stale_after_version_bump(self):
+        post = Post.objects.create(author=self.user, text='Текст')
+        Comment.objects.create(author=self.user, post=post, text='Ответ')
+        version = RENDERER_VERSION + 1
+        with mock.patch.object(rendering, 'RENDERER_VERSION', version), \
+                mock.patch.object(tasks, 'RENDERER_VERSION', version):
+            tasks.rerender_stale(batch_size=1)
+            post.refresh_from_db()
+            self.assertEqual(post.html_version, version)
+            # Пачка была полной: задача поставила себя снова.
+            self.assertTrue(Job.objects.filter(
+                name=tasks.rerender_stale.task_name).exists())
+
+    def test_version_bump_enqueued_after_migrate(self):
+        Post.objects.create(author=self.user, text='Текст')
+        name = tasks.rerender_stale.task_name
+        tasks.enqueue_stale_rerender()
+        self.assertFalse(Job.objects.filter(name=name).exists())
+        version = RENDERER_VERSION + 1
+        with mock.patch.object(tasks, 'RENDERER_VERSION', version):
+            tasks.enqueue_stale_rerender()
+            tasks.enqueue_stale_rerender()
+        self.assertEqual(Job.objects.filter(name=name).count(), 1)
+
+    def test_partial_migrate_skips_rerender(self):
+        """migrate до 0009 не обращается к ещё не созданному столбцу."""
+        Post.objects.create(author=self.user, text='Текст')
+        state = MigrationLoader(connection).project_state(
+            ('posts', '0009_post_excerpt'))
+        version = RENDERER_VERSION + 1
+        with mock.patch.object(tasks, 'RENDERER_VERSION', version):
+            with self.assertNumQueries(0):
+                tasks.enqueue_stale_rerender(apps=state.apps)
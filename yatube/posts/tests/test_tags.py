@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Notification, Post, TagCount, TagEntry
+from ..tags import tag_page, top_tags
+from ..utils import PAG_PAGE
+
+User = get_user_model()
+
+
+class TagIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.ivan = User.objects.create_user(
+            username='ivan', email='ivan@example.com')
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        return dict(TagCount.objects.values_list('tag', 'count'))
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(author=self.author, text='#Django и #sql')
+        self.assertEqual(
+            set(TagEntry.objects.values_list('tag', flat=True)),
+            {'django', 'sql'},
+        )
+        post.text = '#django'
+        post.save()
+        self.assertEqual(self.counts(), {'django': 1, 'sql': 0})
+        post.delete()
+        self.assertEqual(self.counts(), {'django': 0, 'sql': 0})
+        self.assertEqual(list(top_tags()), [])
+
+    def test_mentions_indexed_and_notified_once(self):
+        post = Post.objects.create(
+            author=self.author, text='Привет, @ivan и @nobody')
+        self.assertEqual(
+            list(TagEntry.objects.values_list('tag', flat=True)), ['@ivan'])
+        post.text += '!'
+        post.save()
+        self.assertEqual(
+            list(Notification.objects.values_list('recipient', 'verb')),
+            [(self.ivan.pk, Notification.MENTION)],
+        )
+
+    def test_tag_feed_cursor_paging(self):
+        posts = [
+            Post.objects.create(author=self.author, text=f'#тег {number}')
+            for number in range(PAG_PAGE + 2)
+        ]
+        Post.objects.create(author=self.author, text='без тега')
+        with self.assertNumQueries(2):
+            first, cursor = tag_page('тег')
+        second, last = tag_page('тег', cursor)
+        self.assertIsNone(last)
+        self.assertEqual(first + second, posts[::-1])
+
+        client = Client()
+        response = client.get(reverse('posts:tag', args=['Тег']))
+        self.assertEqual(len(response.context['posts']), PAG_PAGE)
+        response = client.get(
+            reverse('posts:tag', args=['тег']), {'cursor': 'мусор'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import (Client, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from core.routers import allow_replica, reset
+
+from .. import trending
+from ..models import Post, TrendingScore
+from ..trending import (
+    HALF_LIFE, TrendingTracker, event_score, log_add
+)
+
+User = get_user_model()
+
+
+class ScoreTests(SimpleTestCase):
+    def test_log_add(self):
+        self.assertAlmostEqual(log_add(3.0, 3.0), 4.0)
+        self.assertEqual(log_add(None, 5.0), 5.0)
+
+    def test_newer_event_outweighs_older(self):
+        now = 1_700_000_000
+        # Два события полураспадом раньше весят как одно сейчас.
+        old = log_add(
+            event_score(1, now - HALF_LIFE), event_score(1, now - HALF_LIFE)
+        )
+        self.assertAlmostEqual(old, event_score(1, now))
+        self.assertGreater(event_score(1, now), event_score(1, now - 60))
+
+
+class TrendingTrackerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_flush_merges_and_keeps_top_k(self):
+        tracker = TrendingTracker(top_k=2)
+        now = 1_700_000_000
+        for post, weight in zip(self.posts, (1, 2, 3)):
+            tracker.record(post.pk, weight, when=now)
+        tracker.flush()
+        self.assertEqual(
+            list(TrendingScore.objects.order_by('-score').values_list(
+                'post_id', flat=True)),
+            [self.posts[2].pk, self.posts[1].pk],
+        )
+        # Сброс другого процесса складывается с сохранённой оценкой.
+        other = TrendingTracker(top_k=2)
+        other.record(self.posts[1].pk, 2, when=now)
+        other.flush()
+        self.assertAlmostEqual(
+            TrendingScore.objects.get(pk=self.posts[1].pk).score,
+            event_score(4, now),
+        )
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_flush_reads_from_primary(self):
+        """Сброс при разрешённой реплике не читает с неё."""
+        tracker = TrendingTracker()
+        tracker.record(self.posts[0].pk, 1)
+        allow_replica(True)
+        try:
+            # Запрос к replica в этом тесте завершился бы ошибкой.
+            tracker.flush()
+        finally:
+            reset()
+        self.assertTrue(
+            TrendingScore.objects.filter(pk=self.posts[0].pk).exists())
+
+    @mock.patch.object(trending, 'FLUSH_EVENTS', 1)
+    def test_failed_inline_flush_keeps_scores(self):
+        tracker = TrendingTracker()
+        self.addCleanup(tracker.flusher.cancel)
+        with mock.patch.object(
+            TrendingTracker, '_write', side_effect=DatabaseError
+        ):
+            with self.assertLogs('core.counters', 'ERROR'):
+                tracker.record(self.posts[0].pk, 1)
+        self.assertIn(self.posts[0].pk, tracker.pending)
+        tracker.flush()
+        self.assertTrue(
+            TrendingScore.objects.filter(pk=self.posts[0].pk).exists())
+
+    def test_trending_page(self):
+        tracker = TrendingTracker()
+        tracker.record(self.posts[0].pk, 1)
+        tracker.flush()
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']), [self.posts[0]])
+        self.assertTrue(response.context['trending'])
+
+
+class TrendingTimerTests(TransactionTestCase):
+    @mock.patch.object(trending, 'FLUSH_INTERVAL', 0.05)
+    def test_idle_tracker_flushed_by_timer(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(author=author, text='Пост')
+        tracker = TrendingTracker()
+        tracker.record(post.pk, 1)
+        self.assertFalse(TrendingScore.objects.exists())
+        tracker.flusher.timer.join(5)
+        self.assertTrue(TrendingScore.objects.filter(pk=post.pk).exists())
@@ -6,9 +6,11 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from posts.follows import resolve_follows
 from posts.models import Follow, Group, Post
+from posts.utils import ElidedPaginator
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -141,12 +143,30 @@ class PostsPagesTests(TestCase):
         response = self.author_client.get(reverse('posts:index'))
         response_post = response.context['page_obj'][0]
         self.assertEqual(post, response_post)
-        post.delete()
+        # update() не отправляет сигналов: фрагмент остаётся в кэше.
+        Post.objects.filter(pk=post.pk).update(
+            text='Изменённый текст', excerpt='Изменённый текст')
+        # Кнопки отметок в ленте несут свой csrf-токен на каждый запрос,
+        # поэтому сравниваем текст поста, а не страницу целиком.
         response_2 = self.author_client.get(reverse('posts:index'))
-        self.assertEqual(response.content, response_2.content)
+        self.assertContains(response_2, 'Текст')
+        self.assertNotContains(response_2, 'Изменённый текст')
         cache.clear()
         response_3 = self.author_client.get(reverse('posts:index'))
-        self.assertNotEqual(response.content, response_3.content)
+        self.assertContains(response_3, 'Изменённый текст')
+
+    def test_cache_invalidated_on_write(self):
+        """Удаление поста сбрасывает кэш главной по тегу feed:index."""
+        post = Post.objects.create(
+            text='Удаляемый пост',
+            author=self.author,
+            group=self.group
+        )
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertContains(response, post.text)
+        post.delete()
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertNotContains(response, post.text)
 
     def test_no_in_wrong_group(self):
         """Пост не появляется в чужой группе."""
@@ -204,6 +224,22 @@ class PaginatorViewTest(TestCase):
                              3, msg=url)
 
 
+class ElidedPaginatorTests(SimpleTestCase):
+    def test_window_ends_and_deep_jumps(self):
+        """Окно вокруг текущей, края и переходы на ±10^k страниц."""
+        paginator = ElidedPaginator(range(100000), 10)
+        dots = paginator.ELLIPSIS
+        self.assertEqual(list(paginator.get_elided_page_range(5000)), [
+            1, dots, 4000, dots, 4900, dots, 4990, dots,
+            4997, 4998, 4999, 5000, 5001, 5002, 5003,
+            dots, 5010, dots, 5100, dots, 6000, dots, 10000,
+        ])
+        self.assertEqual(
+            list(ElidedPaginator(range(50), 10).get_elided_page_range(3)),
+            [1, 2, 3, 4, 5],
+        )
+
+
 class FollowTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -269,3 +305,44 @@ class FollowTests(TestCase):
             reverse('posts:follow_index'))
         post_unfollower = len(response_unfollower.context['page_obj'])
         self.assertEqual(post_unfollower, 0)
+
+
+class FollowResolverTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.viewer = User.objects.create_user(username='viewer')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.viewer, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.viewer_client = Client()
+        self.viewer_client.force_login(self.viewer)
+
+    def test_resolve_follows_one_query_then_cached(self):
+        """Состояние подписки для страницы — один запрос, затем кэш."""
+        ids = [self.author.pk, self.other.pk]
+        with self.assertNumQueries(1):
+            follows = resolve_follows(self.viewer, ids)
+        self.assertEqual(
+            follows, {self.author.pk: True, self.other.pk: False})
+        with self.assertNumQueries(0):
+            resolve_follows(self.viewer, ids)
+
+    def test_profile_following_uses_viewer(self):
+        """Кнопка подписки зависит от зрителя, а не от владельца профиля."""
+        response = self.viewer_client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        self.assertTrue(response.context['following'])
+        response = self.viewer_client.get(
+            reverse('posts:profile', args=[self.other.username]))
+        self.assertFalse(response.context['following'])
+
+    def test_follow_invalidates_cache(self):
+        resolve_follows(self.viewer, [self.other.pk])
+        self.viewer_client.get(
+            reverse('posts:profile_follow', args=[self.other.username]))
+        self.assertTrue(
+            resolve_follows(self.viewer, [self.other.pk])[self.other.pk])
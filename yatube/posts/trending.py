@@ -0,0 +1,139 @@
+import math
+import threading
+import time
+
+from django.db import DatabaseError, router, transaction
+
+from core.counters import FlushTimer
+
+from .models import Post, TrendingScore
+
+# Вклад события в оценку уменьшается вдвое за HALF_LIFE секунд.
+HALF_LIFE = 6 * 60 * 60
+# Точка отсчёта времени: держит показатели степени небольшими.
+EPOCH = 1_600_000_000
+COMMENT_WEIGHT = 1.0
+VIEW_WEIGHT = 0.1
+# Сколько постов хранится во вкладке «Популярное».
+TOP_K = 100
+# Локальные приращения сбрасываются в базу не позже чем через
+# FLUSH_INTERVAL секунд после первого несброшенного события или при
+# накоплении FLUSH_EVENTS событий.
+FLUSH_INTERVAL = 10
+FLUSH_EVENTS = 500
+
+
+def event_score(weight, when=None):
+    """Логарифм вклада события с учётом времени (forward decay)."""
+    when = time.time() if when is None else when
+    return math.log2(weight) + (when - EPOCH) / HALF_LIFE
+
+
+def log_add(a, b):
+    """log2(2 ** a + 2 ** b) без переполнения."""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+class TrendingTracker:
+    """Приращения оценок в памяти процесса с периодическим сбросом.
+
+    Каждый процесс копит свою сумму по постам и при сбросе складывает
+    её с сохранённой оценкой в одной транзакции записи; сложение
+    коммутативно, так что порядок сбросов разных процессов не важен.
+    Кроме проверки при каждом событии буфер сбрасывает фоновый таймер,
+    поэтому при падении процесса теряется не больше FLUSH_EVENTS его
+    событий за последние FLUSH_INTERVAL секунд. record() не пробрасывает
+    ошибки базы, явный flush() пробрасывает.
+    """
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self.pending = {}
+        self.events = 0
+        self.flushed_at = time.monotonic()
+        self.flusher = FlushTimer(FLUSH_INTERVAL, self.flush, 'популярного')
+        self.lock = threading.Lock()
+
+    def record(self, post_id, weight, when=None):
+        score = event_score(weight, when)
+        with self.lock:
+            self.pending[post_id] = log_add(self.pending.get(post_id), score)
+            self.events += 1
+            due = (
+                self.events >= FLUSH_EVENTS
+                or time.monotonic() - self.flushed_at >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flusher.call()
+        else:
+            self.flusher.arm()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.events = 0
+            self.flushed_at = time.monotonic()
+        self.flusher.cancel()
+        if not pending:
+            return
+        try:
+            self._write(pending)
+        except DatabaseError:
+            # Оценки вернутся в буфер и уйдут со следующим сбросом.
+            with self.lock:
+                for post_id, score in pending.items():
+                    self.pending[post_id] = log_add(
+                        self.pending.get(post_id), score)
+                self.events += len(pending)
+            self.flusher.arm()
+            raise
+
+    def _write(self, pending):
+        # Всё читается из базы записи: с отстающей реплики пришли бы
+        # старые оценки, и вставка упала бы на уникальном ключе.
+        using = router.db_for_write(TrendingScore)
+        with transaction.atomic(using=using):
+            scores = TrendingScore.objects.using(using)
+            stored = dict(scores.filter(
+                pk__in=pending).values_list('pk', 'score'))
+            existing = set(Post.objects.using(using).filter(
+                pk__in=pending).values_list('pk', flat=True))
+            rows = [
+                TrendingScore(
+                    post_id=post_id,
+                    score=log_add(stored.get(post_id), score),
+                )
+                for post_id, score in pending.items() if post_id in existing
+            ]
+            scores.filter(pk__in=stored).delete()
+            scores.bulk_create(rows)
+            self.prune(using)
+
+    def prune(self, using=None):
+        """Оставляет в таблице только top_k лучших постов."""
+        scores = TrendingScore.objects.using(
+            using or router.db_for_write(TrendingScore))
+        threshold = scores.order_by('-score').values_list(
+            'score', flat=True)[self.top_k:self.top_k + 1]
+        if threshold:
+            scores.filter(score__lte=threshold[0]).delete()
+
+
+tracker = TrendingTracker()
+
+
+def record_comment(post_id):
+    tracker.record(post_id, COMMENT_WEIGHT)
+
+
+def record_views(post_id, count):
+    tracker.record(post_id, VIEW_WEIGHT * count)
+
+
+def trending_posts():
+    """Популярные посты: чтение не больше TOP_K строк по индексу score."""
+    return Post.objects.select_related('author', 'group').for_list().filter(
+        trending__isnull=False).order_by('-trending__score')[:TOP_K]
@@ -1,13 +1,15 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('trending/', views.trending, name='trending'),
     path('create/', views.post_create, name='post_create'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
@@ -17,6 +19,11 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path(
+        'posts/<int:post_id>/unlike/', views.post_unlike, name='post_unlike'
+    ),
+    path('notifications/', views.notifications, name='notifications'),
     path(
         'follow/',
         views.follow_index,
@@ -32,4 +39,33 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('api/follow/', api.follow_index, name='api_follow_index'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        api.post_comments,
+        name='api_post_comments'
+    ),
+    path('feeds/rss/', feeds.index_rss, name='feed_index_rss'),
+    path('feeds/atom/', feeds.index_atom, name='feed_index_atom'),
+    path('group/<slug:name>/rss/', feeds.group_rss, name='feed_group_rss'),
+    path(
+        'group/<slug:name>/atom/', feeds.group_atom, name='feed_group_atom'
+    ),
+    path(
+        'profile/<str:name>/rss/', feeds.author_rss, name='feed_author_rss'
+    ),
+    path(
+        'profile/<str:name>/atom/',
+        feeds.author_atom,
+        name='feed_author_atom'
+    ),
 ]
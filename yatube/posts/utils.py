@@ -1,9 +1,51 @@
 from django.core.paginator import Paginator
 
 PAG_PAGE = 10
+# Страниц по обе стороны от текущей и в начале и конце списка.
+ON_EACH_SIDE = 3
+ON_ENDS = 1
+
+
+class ElidedPaginator(Paginator):
+    """Paginator с сокращённым списком страниц, как в Django 3.2."""
+
+    ELLIPSIS = '…'
+
+    def get_elided_page_range(self, number=1, *, on_each_side=ON_EACH_SIDE,
+                              on_ends=ON_ENDS):
+        """Первые и последние on_ends страниц, on_each_side вокруг
+        текущей и переходы вглубь на ±10, ±100, ... страниц.
+
+        Пропуски отмечены ELLIPSIS. Номеров O(on_each_side + log N),
+        полный range(num_pages) не строится.
+        """
+        number = self.validate_number(number)
+        last = self.num_pages
+        pages = set(range(1, min(on_ends, last) + 1))
+        pages.update(range(max(last - on_ends + 1, 1), last + 1))
+        pages.update(range(
+            max(number - on_each_side, 1),
+            min(number + on_each_side, last) + 1,
+        ))
+        step = 10
+        while step < last:
+            pages.update(
+                page for page in (number - step, number + step)
+                if 1 <= page <= last
+            )
+            step *= 10
+        previous = 0
+        for page in sorted(pages):
+            if page - previous > 1:
+                yield self.ELLIPSIS
+            yield page
+            previous = page
 
 
 def get_paginator(request, posts):
     page_number = request.GET.get('page')
-    page_obj = Paginator(posts, PAG_PAGE).get_page(page_number)
+    paginator = ElidedPaginator(posts, PAG_PAGE)
+    page_obj = paginator.get_page(page_number)
+    page_obj.elided_range = list(
+        paginator.get_elided_page_range(page_obj.number))
     return page_obj
@@ -1,72 +1,174 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
 
+from core.auth import user_tag
+from core.caching import get_or_compute
+from core.pagecache import PAGE_TIMEOUT, cached_page
+from core.querycache import cached
+from core.queue import enqueue
+
+from .api import BadCursor
+from .counters import post_views, view_count
+from .exports import CONTENT_TYPES, EXPORT_FORMATS, stream_export
+from .follows import resolve_follows
 from .forms import CommentForm, PostForm
+from .graph import MAX_IN_IDS, followee_ids
 from .models import Group, Post, Follow
+from .notifications import mark_read
+from .reactions import like, reaction_state, unlike
+from .recommendations import recommended_authors
+from .tags import tag_page, top_tags
+from .tasks import warm_thumbnails
+from .trending import trending_posts
 from .utils import get_paginator
 
 User = get_user_model()
 
+NOTIFICATIONS_PAGE = 50
+
+
+def _list_state(viewer, posts):
+    """Отметки и подписки зрителя для постов из posts/includes/post_list."""
+    return {
+        'reactions': reaction_state(viewer, posts),
+        'follows': resolve_follows(
+            viewer, [post.author_id for post in posts]),
+    }
+
+
+def _page_reactions(request, holes):
+    return _list_state(
+        request.user, [hole['post'] for hole in holes if 'post' in hole])
+
 
 def index(request):
-    title = 'Последние обновления на сайте'
-    user = get_object_or_404(User, username=request.user)
-    posts = Post.objects.select_related('author', 'group')
+    def page_context():
+        posts = cached(
+            Post.objects.select_related('author', 'group').for_list()
+        )
+        return {
+            'title': 'Последние обновления на сайте',
+            'page_obj': get_paginator(request, posts),
+            'posts_index': True,
+            'top_tags': cached(top_tags()),
+        }
+
+    return cached_page(
+        request, 'posts/index.html', page_context,
+        personalize=_page_reactions, tags=['feed:index'],
+    )
+
+
+def trending(request):
+    posts = cached(trending_posts())
     page_obj = get_paginator(request, posts)
-    following = user.is_authenticated and user.following.exists()
     context = {
-        'title': title,
         'page_obj': page_obj,
-        'follow': following,
+        'trending': True,
+        **_list_state(request.user, page_obj),
     }
-    return render(request, 'posts/index.html', context)
+    return render(request, 'posts/trending.html', context)
 
 
-def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = get_paginator(request, posts)
+def tag_posts(request, name):
+    tag = name.lower()
+    try:
+        posts, next_cursor = tag_page(tag, request.GET.get('cursor'))
+    except BadCursor:
+        raise Http404
     context = {
-        'group': group,
+        'tag': tag,
         'posts': posts,
-        'page_obj': page_obj,
+        'next_cursor': next_cursor,
+        **_list_state(request.user, posts),
     }
-    return render(request, 'posts/group_list.html', context)
+    return render(request, 'posts/tag_list.html', context)
+
+
+def group_posts(request, slug):
+    def page_context():
+        group = get_object_or_404(cached(Group.objects), slug=slug)
+        posts = cached(group.posts.for_list())
+        return {
+            'group': group,
+            'posts': posts,
+            'page_obj': get_paginator(request, posts),
+        }
+
+    return cached_page(
+        request, 'posts/group_list.html', page_context,
+        personalize=_page_reactions, tags=[f'group:{slug}'],
+    )
 
 
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
+    user = get_object_or_404(cached(User.objects), username=username)
+    posts = cached(user.posts.for_list())
     page_obj = get_paginator(request, posts)
-    following = user.is_authenticated and user.following.exists()
+    following = resolve_follows(request.user, [user.pk])[user.pk]
     context = {
         'author': user,
         'page_obj': page_obj,
         'username': username,
         'following': following,
+        'reactions': reaction_state(request.user, page_obj),
+        'recommended': recommended_authors(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def _post_tags(post_id):
+    """Теги страницы поста: сам пост, его автор и группа.
+
+    Автор и slug группы берутся из кэша под тегом post:<id>; смена slug
+    сбрасывает post:<id> постов группы (signals.invalidate_group).
+    """
+    def refs():
+        return list(Post.objects.filter(pk=post_id).values_list(
+            'author_id', 'author__username', 'group__slug')[:1])
+
+    found = get_or_compute(
+        f'post:refs:{post_id}', refs, PAGE_TIMEOUT,
+        tags=[f'post:{post_id}'],
+    )
+    tags = [f'post:{post_id}']
+    if found:
+        author_id, username, slug = found[0]
+        tags += [user_tag(author_id), f'author:{username}']
+        if slug is not None:
+            tags.append(f'group:{slug}')
+    return tags
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    user = get_object_or_404(User, username=post.author)
-    post_number = Post.objects.select_related(
-        'author', 'post_id'
-    ).filter(author__username=post.author).count()
-    form = CommentForm()
-    context = {
-        'author': user,
-        'post': post,
-        'title': post.text,
-        'posts_number': post_number,
-        'image': post.image or None,
-        'form': form,
-        'comments': post.comments.all(),
-    }
-    return render(request, 'posts/post_detail.html', context)
+    def page_context():
+        post = get_object_or_404(
+            Post.objects.select_related('author', 'group'), pk=post_id
+        )
+        user = post.author
+        return {
+            'author': user,
+            'post': post,
+            'title': post.text,
+            'posts_number': user.posts.count(),
+            'image': post.image or None,
+            'comments': post.comments.all(),
+        }
+
+    def personalize(request, holes):
+        # Вызывается, только когда пост существует: каркас собран.
+        post_views.incr(post_id)
+        return {'form': CommentForm(), 'views': view_count(post_id)}
+
+    return cached_page(
+        request, 'posts/post_detail.html', page_context,
+        personalize=personalize, tags=_post_tags(post_id),
+    )
 
 
 @login_required
@@ -80,6 +182,8 @@ def post_create(request):
             instance = form.save(commit=False)
             instance.author = request.user
             instance.save()
+            if instance.image:
+                enqueue(warm_thumbnails, instance.pk)
             return redirect('posts:profile', request.user)
         return render(request, 'posts/create_post.html', context)
     except IntegrityError:
@@ -102,6 +206,8 @@ def post_edit(request, post_id):
     if post.author == request.user:
         if request.method == "POST" and form.is_valid():
             post = form.save()
+            if 'image' in form.changed_data and post.image:
+                enqueue(warm_thumbnails, post.pk)
             return redirect('posts:post_detail', post_id)
         context = {
             'form': form,
@@ -128,13 +234,31 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user)
+    # Список подписок берём из графа в памяти: лента строится по индексу
+    # (author_id, pub_date) без подзапроса к Follow.
+    authors = followee_ids(request.user)
+    if authors is None or len(authors) > MAX_IN_IDS:
+        posts = Post.objects.for_list().following(request.user)
+    else:
+        posts = Post.objects.for_list().filter(author_id__in=authors)
     page_obj = get_paginator(request, posts)
-    context = {'page_obj': page_obj}
+    context = {
+        'page_obj': page_obj,
+        'reactions': reaction_state(request.user, page_obj),
+        'recommended': recommended_authors(request.user),
+    }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def notifications(request):
+    items = request.user.notifications.select_related('actor', 'post')[
+        :NOTIFICATIONS_PAGE]
+    context = {'notifications': list(items)}
+    mark_read(request.user)
+    return render(request, 'posts/notifications.html', context)
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -150,3 +274,43 @@ def profile_follow(request, username):
 def profile_unfollow(request, username):
     Follow.objects.get(user=request.user, author__username=username).delete()
     return redirect('posts:profile', username)
+
+
+@require_POST
+@login_required
+def post_like(request, post_id):
+    get_object_or_404(Post, pk=post_id)
+    like(request.user, post_id)
+    return redirect_back(request, post_id)
+
+
+@require_POST
+@login_required
+def post_unlike(request, post_id):
+    unlike(request.user, post_id)
+    return redirect_back(request, post_id)
+
+
+def redirect_back(request, post_id):
+    next_url = request.POST.get('next')
+    if next_url and is_safe_url(next_url, {request.get_host()}):
+        return redirect(next_url)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        return redirect('posts:profile', username)
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404
+    response = StreamingHttpResponse(
+        stream_export(author, export_format),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.{export_format}"'
+    )
+    return response
@@ -1,5 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from core.queue import enqueue
+
+from .tasks import send_mail
 
 User = get_user_model()
 
@@ -8,3 +13,20 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо рендерится в запросе, а отправляется фоновым воркером."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_message = None
+        if html_email_template_name is not None:
+            html_message = loader.render_to_string(
+                html_email_template_name, context)
+        enqueue(send_mail, subject, body, from_email, to_email,
+                html_message=html_message, priority=10)
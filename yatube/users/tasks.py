@@ -0,0 +1,11 @@
+from django.core.mail import EmailMultiAlternatives
+
+from core.queue import task
+
+
+@task
+def send_mail(subject, body, from_email, to_email, html_message=None):
+    message = EmailMultiAlternatives(subject, body, from_email, [to_email])
+    if html_message is not None:
+        message.attach_alternative(html_message, 'text/html')
+    message.send()
@@ -1,4 +1,5 @@
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,7 +33,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
-    'core',
+    'core.apps.CoreConfig',
     'sorl.thumbnail',
    # 'debug_toolbar',
 ]
@@ -46,7 +47,8 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
  #   'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -71,6 +73,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.notifications',
             ],
         },
     },
@@ -87,11 +90,40 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite с WAL и настройками PRAGMA, см. core/backends/sqlite3
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    # Копия основной базы, обновляется командой sync_replica.
+    'replica': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Алиасы реплик для чтения; пустой список — всё читается из default.
+# Чтобы включить: python manage.py sync_replica и DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+# Представления, которым можно читать с реплики.
+REPLICA_VIEWS = {
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
 }
 
+# Сколько секунд после записи пользователь читает только из default.
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -145,6 +177,31 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Общий для всех воркеров кэш в файле SQLite, см. core/cache.py
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
+
+# Тесты не трогают cache.sqlite3 запущенного сервера: их cache.clear()
+# стирал бы его кэш, а записи из тестовой базы он мог бы потом отдать.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+
+# Сессии в базе с чтением из кэша; неизменная сессия не пишется
+# заново, срок в базе продлевается порциями, см. core/sessions.py
+SESSION_ENGINE = 'core.sessions'
+SESSION_SAVE_EVERY_REQUEST = True
+
+# Кэш результатов запросов ORM, включается для queryset через
+# core.querycache.cached(); False отключает его целиком.
+QUERY_CACHE_ENABLED = True